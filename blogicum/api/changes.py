@@ -0,0 +1,139 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from blog.models import Comment, DeletedObject, Post
+from blog.querysets import get_query_set_post
+
+from .serializers import CommentSerializer, PostSerializer
+
+CHANGES_LIMIT = 500
+
+
+def encode_cursor(position):
+    payload = json.dumps(position)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Позиции потоков постов, комментариев и удалений."""
+    if not cursor:
+        return {'p': None, 'c': None, 'd': 0}
+    try:
+        position = json.loads(base64.urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4)
+        ))
+        for key in ('p', 'c'):
+            if position[key] is not None:
+                changed_at, pk = position[key]
+                changed_at = parse_datetime(changed_at)
+                if changed_at is None:
+                    raise ValueError
+                position[key] = [changed_at, int(pk)]
+        position['d'] = int(position['d'])
+        return position
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValidationError({'cursor': 'Некорректный курсор.'})
+
+
+def after(field, position):
+    """Условие «строго после (field, id)» для ленты изменений.
+
+    Отдельное условие по `field` позволяет начать чтение индекса
+    (field, id) сразу с позиции курсора.
+    """
+    if position is None:
+        return Q()
+    changed_at, pk = position
+    return Q(**{f'{field}__gte': changed_at}) & (
+        Q(**{f'{field}__gt': changed_at})
+        | Q(**{field: changed_at, 'pk__gt': pk})
+    )
+
+
+def get_changed_posts(position, limit):
+    """Посты, изменённые или ставшие видимыми по расписанию.
+
+    `changed_at` отложенного поста не раньше `pub_date`: пост попадает
+    в ленту, когда наступает дата публикации, даже если его
+    не редактировали.
+    """
+    return list(Post.objects.select_related(
+        'category', 'location', 'author'
+    ).filter(
+        after('changed_at', position),
+        changed_at__lte=timezone.now()
+    ).order_by('changed_at', 'pk')[:limit])
+
+
+def get_changed_comments(position, limit):
+    """Комментарии, изменённые после курсора.
+
+    Когда меняется видимость поста, его комментариям проставляется
+    `changed_at` поста, и лента выдаёт их заново: для отложенного
+    поста — когда наступает дата публикации.
+    """
+    return list(Comment.objects.select_related('author').filter(
+        after('updated_at', position),
+        updated_at__lte=timezone.now()
+    ).order_by('updated_at', 'pk')[:limit])
+
+
+def get_deleted_objects(position, limit):
+    return list(DeletedObject.objects.filter(pk__gt=position)[:limit])
+
+
+def get_changes(cursor, limit=CHANGES_LIMIT, context=None):
+    """Изменения после курсора: до `limit` записей каждого вида.
+
+    Посты, которые больше не видны на сайте, и комментарии к ним
+    попадают в `deleted`, как и удалённые объекты.
+    """
+    context = context or {}
+    position = decode_cursor(cursor)
+    posts = get_changed_posts(position['p'], limit)
+    comments = get_changed_comments(position['c'], limit)
+    deleted = get_deleted_objects(position['d'], limit)
+
+    visible_post_ids = set(get_query_set_post().filter(
+        pk__in={post.pk for post in posts}
+        | {comment.post_id for comment in comments}
+    ).values_list('pk', flat=True))
+    result = {'posts': [], 'comments': [], 'deleted': []}
+    for post in posts:
+        if post.pk in visible_post_ids:
+            result['posts'].append(PostSerializer(post, context=context).data)
+        else:
+            result['deleted'].append(
+                {'kind': DeletedObject.POST, 'id': post.pk}
+            )
+    for comment in comments:
+        if comment.post_id in visible_post_ids:
+            result['comments'].append(
+                CommentSerializer(comment, context=context).data
+            )
+        else:
+            result['deleted'].append(
+                {'kind': DeletedObject.COMMENT, 'id': comment.pk}
+            )
+    result['deleted'].extend(
+        {'kind': obj.kind, 'id': obj.object_id} for obj in deleted
+    )
+
+    if posts:
+        position['p'] = [posts[-1].changed_at, posts[-1].pk]
+    if comments:
+        position['c'] = [comments[-1].updated_at, comments[-1].pk]
+    if deleted:
+        position['d'] = deleted[-1].pk
+    for key in ('p', 'c'):
+        if position[key] is not None:
+            position[key][0] = position[key][0].isoformat()
+    result['cursor'] = encode_cursor(position)
+    result['has_more'] = limit in (len(posts), len(comments), len(deleted))
+    return result
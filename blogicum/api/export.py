@@ -0,0 +1,22 @@
+import json
+
+from blog.querysets import get_query_set_post
+
+from .serializers import PostSerializer
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def iter_posts_ndjson(chunk_size=EXPORT_CHUNK_SIZE):
+    """Видимые посты построчно в формате NDJSON.
+
+    Посты читаются из базы порциями по `chunk_size`, поэтому память
+    не зависит от их общего количества.
+    """
+    posts = get_query_set_post().order_by('pk').iterator(
+        chunk_size=chunk_size
+    )
+    for post in posts:
+        yield json.dumps(
+            PostSerializer(post).data, ensure_ascii=False
+        ) + '\n'
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from api.export import EXPORT_CHUNK_SIZE, iter_posts_ndjson
+
+
+class Command(BaseCommand):
+    help = 'Выгружает все видимые посты в формате NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            help='Файл для выгрузки; по умолчанию стандартный вывод.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Сколько постов читать из базы за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        lines = iter_posts_ndjson(options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        count = 0
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            for line in lines:
+                file.write(line)
+                count += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Выгружено постов: {count}')
+        )
@@ -0,0 +1,17 @@
+from rest_framework.pagination import CursorPagination
+
+from blog.views import COMMENT_LIMIT, COMMENT_ORDERING, POST_LIMIT
+
+
+class PostCursorPagination(CursorPagination):
+    page_size = POST_LIMIT
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    ordering = ('-pub_date', '-id')
+
+
+class CommentCursorPagination(CursorPagination):
+    page_size = COMMENT_LIMIT
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    ordering = COMMENT_ORDERING
@@ -0,0 +1,61 @@
+from rest_framework import serializers
+
+from blog.models import Category, Comment, Post
+
+
+class SparseFieldsMixin:
+    """Оставляет только поля из параметра запроса `?fields=a,b`."""
+    fields_param = 'fields'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None:
+            return
+        requested = request.query_params.get(self.fields_param)
+        if not requested:
+            return
+        allowed = set(requested.split(','))
+        for name in set(self.fields) - allowed:
+            self.fields.pop(name)
+
+
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+
+    class Meta:
+        model = Category
+        fields = ('slug', 'title', 'description')
+
+
+class PostCategorySerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Category
+        fields = ('slug', 'title')
+
+
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author = serializers.CharField(source='author.username')
+    category = PostCategorySerializer()
+    location = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Post
+        fields = (
+            'id', 'title', 'text', 'pub_date', 'author', 'category',
+            'location', 'image', 'comment_count', 'created_at', 'updated_at'
+        )
+
+    def get_location(self, post):
+        """Неопубликованное местоположение не раскрывается, как и на сайте."""
+        if post.location and post.location.is_published:
+            return post.location.name
+        return None
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    author = serializers.CharField(source='author.username')
+
+    class Meta:
+        model = Comment
+        fields = ('id', 'post', 'author', 'text', 'created_at', 'updated_at')
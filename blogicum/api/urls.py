@@ -0,0 +1,25 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+app_name = 'api'
+
+router_v1 = DefaultRouter()
+router_v1.register('posts', views.PostViewSet, basename='post')
+router_v1.register(
+    r'posts/(?P<post_id>\d+)/comments',
+    views.CommentViewSet,
+    basename='comment'
+)
+router_v1.register('categories', views.CategoryViewSet, basename='category')
+
+urlpatterns = [
+    path('v1/changes/', views.ChangesView.as_view(), name='changes'),
+    path(
+        'v1/export/posts.ndjson',
+        views.export_posts,
+        name='export_posts'
+    ),
+    path('v1/', include(router_v1.urls)),
+]
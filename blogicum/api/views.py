@@ -0,0 +1,93 @@
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import viewsets
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from blog.cache import INDEX_SCOPE, post_scope
+from blog.models import Category, Post
+from blog.querysets import get_query_set_post
+from blog.views import ConditionalGetMixin
+
+from .changes import get_changes
+from .export import iter_posts_ndjson
+from .pagination import CommentCursorPagination, PostCursorPagination
+from .serializers import (
+    CategorySerializer, CommentSerializer, PostSerializer
+)
+
+
+class PostViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """Опубликованные посты по тем же правилам, что и ленты сайта."""
+    serializer_class = PostSerializer
+    pagination_class = PostCursorPagination
+    lookup_value_regex = r'\d+'
+
+    def get_cache_scopes(self):
+        if 'pk' in self.kwargs:
+            return (post_scope(self.kwargs['pk']),)
+        return (INDEX_SCOPE,)
+
+    def get_scheduled_posts(self):
+        if 'pk' in self.kwargs:
+            return Post.objects.filter(pk=self.kwargs['pk'])
+        return Post.objects.all()
+
+    def get_queryset(self):
+        return get_query_set_post()
+
+
+class CategoryViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    serializer_class = CategorySerializer
+    lookup_field = 'slug'
+    pagination_class = None
+
+    def get_cache_scopes(self):
+        return ()
+
+    def get_scheduled_posts(self):
+        return Post.objects.none()
+
+    def get_queryset(self):
+        return Category.objects.filter(is_published=True).order_by('title')
+
+
+class CommentViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    """Комментарии опубликованного поста."""
+    serializer_class = CommentSerializer
+    pagination_class = CommentCursorPagination
+
+    def get_cache_scopes(self):
+        return (post_scope(self.kwargs['post_id']),)
+
+    def get_scheduled_posts(self):
+        return Post.objects.filter(pk=self.kwargs['post_id'])
+
+    def get_queryset(self):
+        post = get_object_or_404(
+            get_query_set_post(), pk=self.kwargs['post_id']
+        )
+        return post.comments.select_related('author')
+
+
+def export_posts(request):
+    """Выгрузка всех видимых постов одним потоковым ответом."""
+    response = StreamingHttpResponse(
+        iter_posts_ndjson(), content_type='application/x-ndjson'
+    )
+    response['Content-Disposition'] = 'attachment; filename="posts.ndjson"'
+    return response
+
+
+class ChangesView(APIView):
+    """Лента изменений постов и комментариев после курсора.
+
+    Клиент передаёт `?cursor=` из предыдущего ответа и повторяет
+    запрос, пока `has_more` истинно.
+    """
+
+    def get(self, request):
+        return Response(get_changes(
+            request.query_params.get('cursor'),
+            context={'request': request}
+        ))
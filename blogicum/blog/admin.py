@@ -3,6 +3,20 @@ from django.contrib import admin
 from .models import (
     Category, Location, Post, Comment
 )
+from .search import COMMENT_INDEX, POST_INDEX, build_match_query
+
+
+class FullTextSearchMixin:
+    """Поиск в админке через индекс FTS5 вместо LIKE '%...%'."""
+    search_index = None
+
+    def get_search_results(self, request, queryset, search_term):
+        match = build_match_query(search_term)
+        if not match:
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return self.search_index.filter(queryset, match), False
 
 
 @admin.display(description='Текст комментария')
@@ -10,14 +24,9 @@ def trim_field_text(obj):
     return u"%s..." % (obj.text[:150],)
 
 
-# Count('comments')
-@admin.display(description='Комментариев')
-def comment_count(obj):
-    return obj.comments.count()
-
-
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_index = POST_INDEX
     list_display = (
         'id',
         'title',
@@ -26,7 +35,7 @@ class PostAdmin(admin.ModelAdmin):
         'category',
         'author',
         'location',
-        comment_count
+        'comment_count'
     )
     list_editable = (
         'category',
@@ -36,6 +45,7 @@ class PostAdmin(admin.ModelAdmin):
     )
     search_fields = (
         'title',
+        'text',
     )
     list_filter = (
         'category',
@@ -95,7 +105,8 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    search_index = COMMENT_INDEX
     list_display = (
         'pk',
         'author',
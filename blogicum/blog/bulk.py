@@ -0,0 +1,31 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def fill_auto_dates(instance):
+    """Проставляет текущее время в пустые поля auto_now/auto_now_add."""
+    for field in instance._meta.local_concrete_fields:
+        if not (getattr(field, 'auto_now', False)
+                or getattr(field, 'auto_now_add', False)):
+            continue
+        if getattr(instance, field.attname) is None:
+            field.pre_save(instance, add=True)
+
+
+def insert_raw(model, objs, using=DEFAULT_DB_ALIAS):
+    """Вставляет объекты пачками, как bulk_create, но в «сыром» режиме.
+
+    bulk_create вызывает pre_save полей, и auto_now/auto_now_add
+    перезаписали бы заданные даты; здесь значения вставляются как есть,
+    как при loaddata. Сигналы не отправляются, первичные ключи
+    не возвращаются — их нужно задать заранее.
+    """
+    fields = model._meta.local_concrete_fields
+    objs = list(objs)
+    for obj in objs:
+        fill_auto_dates(obj)
+    step = connections[using].ops.bulk_batch_size(fields, objs) or len(objs)
+    manager = model._base_manager.using(using)
+    for start in range(0, len(objs), step):
+        manager._insert(
+            objs[start:start + step], fields=fields, using=using, raw=True
+        )
@@ -0,0 +1,234 @@
+import hashlib
+import math
+import time
+
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from monitoring.metrics import record_cache
+
+from .models import Post
+
+POST_CARD_KEY = 'blog:post_card:{}'
+POST_CARD_TIMEOUT = 60 * 60 * 24
+
+PAGE_KEY = 'blog:page:{}:{}'
+PAGE_TIMEOUT = 60 * 10
+
+COUNT_KEY = 'blog:count:{}'
+COUNT_THRESHOLD = 1000
+COUNT_TIMEOUT = 60 * 5
+COUNT_STALE_TIMEOUT = 60 * 60
+
+GENERATION_KEY = 'blog:generation:{}'
+SCHEDULE_KEY = 'blog:schedule:{}'
+MISSING = object()
+GLOBAL_SCOPE = 'all'
+INDEX_SCOPE = 'index'
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def profile_scope(username):
+    return f'profile:{username}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def post_card_key(post_id):
+    return POST_CARD_KEY.format(post_id)
+
+
+def get_post_card(post):
+    """Возвращает HTML карточки из кеша, если он не устарел."""
+    cached = cache.get(post_card_key(post.pk))
+    hit = cached is not None and cached[0] == post.updated_at
+    record_cache('post_card', hit)
+    return cached[1] if hit else None
+
+
+def set_post_card(post, html):
+    cache.set(
+        post_card_key(post.pk), (post.updated_at, html), POST_CARD_TIMEOUT
+    )
+
+
+def invalidate_post_cards(post_ids):
+    cache.delete_many([post_card_key(post_id) for post_id in post_ids])
+
+
+def build_post_page_scopes(post_id, slug, username):
+    """Области кеша страниц публикации по slug категории и автору."""
+    scopes = [INDEX_SCOPE, post_scope(post_id)]
+    if slug:
+        scopes.append(category_scope(slug))
+    if username:
+        scopes.append(profile_scope(username))
+    return scopes
+
+
+def get_post_page_scopes(post_id):
+    """Области кеша страниц, на которых выводится публикация."""
+    values = Post.objects.filter(pk=post_id).values_list(
+        'category__slug', 'author__username'
+    ).first()
+    return build_post_page_scopes(post_id, *(values or (None, None)))
+
+
+def invalidate_post(post_id):
+    """Сбрасывает карточку и страницы, на которых выводится публикация."""
+    invalidate_post_cards([post_id])
+    bump_generations(get_post_page_scopes(post_id))
+
+
+def count_key(scope):
+    return COUNT_KEY.format(scope)
+
+
+def get_count(scope):
+    """Закешированное количество публикаций ленты.
+
+    Возвращает пару (количество, устарело ли оно) или None. Через
+    COUNT_STALE_TIMEOUT после подсчёта значение считается отсутствующим,
+    даже если фоновый пересчёт так и не выполнился.
+    """
+    cached = cache.get(count_key(scope))
+    now = time.time()
+    if cached is not None and cached[2] <= now:
+        cached = None
+    record_cache('count', cached is not None)
+    if cached is None:
+        return None
+    count, refresh_at, _ = cached
+    return count, refresh_at <= now
+
+
+def set_count(scope, count):
+    """Кеширует количество, если выборка достаточно большая."""
+    if count < COUNT_THRESHOLD:
+        cache.delete(count_key(scope))
+        return
+    now = time.time()
+    cache.set(
+        count_key(scope),
+        (count, now + COUNT_TIMEOUT, now + COUNT_STALE_TIMEOUT),
+        COUNT_STALE_TIMEOUT
+    )
+
+
+def defer_count_refresh(scope):
+    """Откладывает следующий пересчёт на COUNT_TIMEOUT.
+
+    Срок хранения значения не продлевается: устаревшее количество
+    не может жить дольше COUNT_STALE_TIMEOUT с момента подсчёта.
+    """
+    key = count_key(scope)
+    cached = cache.get(key)
+    if cached is None:
+        return
+    count, _, expires_at = cached
+    now = time.time()
+    if expires_at > now:
+        cache.set(
+            key,
+            (count, now + COUNT_TIMEOUT, expires_at),
+            math.ceil(expires_at - now)
+        )
+
+
+def invalidate_counts(scopes):
+    cache.delete_many([count_key(scope) for scope in set(scopes)])
+
+
+def get_generations(scopes):
+    """Текущие поколения областей кеша.
+
+    Поколение входит в ключ закешированной страницы: чтобы сбросить
+    все страницы области, достаточно увеличить его.
+    Отсутствующее поколение начинается с текущего времени, чтобы
+    не совпасть с уже вытесненным значением.
+    """
+    keys = [GENERATION_KEY.format(scope) for scope in (GLOBAL_SCOPE, *scopes)]
+    generations = cache.get_many(keys)
+    missing = {
+        key: time.time_ns() for key in keys if key not in generations
+    }
+    if missing:
+        cache.set_many(missing, None)
+        generations.update(missing)
+    return [generations[key] for key in keys]
+
+
+def bump_generations(scopes):
+    for scope in set(scopes):
+        key = GENERATION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def get_version(scopes, scheduled_posts):
+    """Версия содержимого страницы и срок, на который её можно кешировать.
+
+    Версия складывается из поколений областей и даты ближайшей
+    отложенной публикации из `scheduled_posts`: когда публикация
+    становится видимой, закешированная дата истекает и версия меняется.
+    """
+    generations = '.'.join(map(str, get_generations(scopes)))
+    key = SCHEDULE_KEY.format(
+        hashlib.md5(f'{scopes}|{generations}'.encode()).hexdigest()
+    )
+    next_pub_date = cache.get(key, MISSING)
+    if next_pub_date is MISSING:
+        next_pub_date = scheduled_posts.filter(
+            is_published=True,
+            pub_date__gt=timezone.now()
+        ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+        cache.set(key, next_pub_date, get_timeout(next_pub_date, None))
+    return (
+        f'{generations}|{next_pub_date}',
+        get_timeout(next_pub_date, PAGE_TIMEOUT)
+    )
+
+
+def get_timeout(next_pub_date, default):
+    if next_pub_date is None:
+        return default
+    timeout = int((next_pub_date - timezone.now()).total_seconds())
+    if default is not None:
+        timeout = min(timeout, default)
+    return max(0, timeout)
+
+
+def get_etag(path, user_id, version, csrf_token=None):
+    """ETag страницы, вычисляемый без обращения к базе данных.
+
+    Страница с формами содержит CSRF-токен, поэтому он тоже входит
+    в ETag: после смены токена браузер не получит 304 со старым.
+    """
+    return hashlib.md5(
+        f'{path}|{user_id}|{version}|{csrf_token}'.encode()
+    ).hexdigest()
+
+
+def page_key(path, version):
+    return PAGE_KEY.format(
+        hashlib.md5(path.encode()).hexdigest(),
+        hashlib.md5(version.encode()).hexdigest()
+    )
+
+
+def get_page(key):
+    response = cache.get(key)
+    record_cache('page', response is not None)
+    return response
+
+
+def set_page(key, response, timeout):
+    cache.set(key, response, timeout)
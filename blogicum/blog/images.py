@@ -0,0 +1,95 @@
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from monitoring.metrics import IMAGE_PROCESSING
+
+from .cache import invalidate_post
+from .models import Post
+
+RENDITION_WIDTHS = (320, 640, 1280)
+RENDITION_FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+
+def rendition_name(name, width, extension):
+    base, _ = os.path.splitext(name)
+    return f'{base}_{width}w.{extension}'
+
+
+def get_rendition_widths(original_width):
+    """Ширины копий, не превышающие ширину оригинала."""
+    widths = [width for width in RENDITION_WIDTHS if width < original_width]
+    if original_width <= RENDITION_WIDTHS[-1]:
+        widths.append(original_width)
+    return widths
+
+
+def delete_renditions(storage, renditions):
+    for extension, _, _ in RENDITION_FORMATS:
+        for _, name in renditions.get(extension, ()):
+            storage.delete(name)
+
+
+def generate_renditions(image_field):
+    """Сохраняет рядом с оригиналом уменьшенные копии в WebP и JPEG.
+
+    Метаданные (EXIF и т.п.) в копии не переносятся, ориентация
+    из EXIF применяется к пикселям.
+    """
+    storage = image_field.storage
+    with image_field.open('rb') as file, Image.open(file) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info
+                                  else 'RGB')
+        renditions = {'source': image_field.name}
+        for width in get_rendition_widths(image.width):
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            for extension, image_format, options in RENDITION_FORMATS:
+                if image_format == 'JPEG' and resized.mode != 'RGB':
+                    resized = resized.convert('RGB')
+                buffer = BytesIO()
+                resized.save(buffer, image_format, **options)
+                name = rendition_name(image_field.name, width, extension)
+                storage.delete(name)
+                name = storage.save(name, ContentFile(buffer.getvalue()))
+                renditions.setdefault(extension, []).append([width, name])
+    return renditions
+
+
+def process_post_image(post_id, force=False):
+    """Создаёт или удаляет копии изображения публикации.
+
+    Возвращает True, если копии изменились.
+    """
+    post = Post.objects.filter(pk=post_id).only(
+        'image', 'image_renditions'
+    ).first()
+    if post is None:
+        return False
+    renditions = post.image_renditions or {}
+    source = post.image.name if post.image else None
+    if not force and renditions.get('source') == source:
+        return False
+    storage = post.image.storage
+    delete_renditions(storage, renditions)
+    new_renditions = {}
+    if source:
+        try:
+            with IMAGE_PROCESSING.time():
+                new_renditions = generate_renditions(post.image)
+        except (OSError, Image.DecompressionBombError):
+            new_renditions = {'source': source}
+    Post.objects.filter(pk=post_id).update(
+        image_renditions=new_renditions,
+        updated_at=timezone.now()
+    )
+    invalidate_post(post_id)
+    return True
@@ -0,0 +1,361 @@
+import http.client
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+import uuid
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Count
+from django.http import HttpRequest
+from django.middleware.csrf import get_token
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Post, User
+from .querysets import get_query_set_post
+
+PERCENTILES = (50, 95, 99)
+HTTP_TIMEOUT = 60
+SEARCH_QUERY = 'монета'
+UNCACHED_PARAM = 'loadtest'
+COMMENT_TEXT = 'Комментарий нагрузочного теста.'
+ANONYMOUS = 'anonymous'
+USER = 'user'
+ADMIN = 'admin'
+
+Scenario = namedtuple(
+    'Scenario', 'name method url auth data uncached', defaults=(None, False)
+)
+
+
+@contextmanager
+def isolated_database():
+    """Временная база с применёнными миграциями вместо основной.
+
+    Для SQLite база создаётся в файле, а не в памяти, чтобы её видел
+    процесс HTTP-сервера.
+    """
+    conn = connections[DEFAULT_DB_ALIAS]
+    old_name = conn.settings_dict['NAME']
+    old_test_name = conn.settings_dict['TEST']['NAME']
+    directory = None
+    if conn.vendor == 'sqlite':
+        directory = tempfile.mkdtemp(prefix='blogicum-loadtest-')
+        conn.settings_dict['TEST']['NAME'] = os.path.join(
+            directory, 'db.sqlite3'
+        )
+    conn.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        yield
+    finally:
+        conn.creation.destroy_test_db(old_name, verbosity=0)
+        conn.settings_dict['TEST']['NAME'] = old_test_name
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def build_scenarios():
+    """Сценарии для текущей базы.
+
+    Для страниц категории, профиля и поста берутся самые наполненные
+    объекты: на них страницы работают дольше всего.
+    Анонимные ленты после первого запроса отдаются из кеша страниц,
+    поэтому для них есть и варианты `*_uncached`, где каждый запрос
+    обходит кеш.
+    """
+    posts = get_query_set_post()
+    feeds = [('index', reverse('blog:index'))]
+    category = posts.values('category__slug').annotate(
+        total=Count('pk')).order_by('-total').first()
+    if category:
+        feeds.append(('category', reverse(
+            'blog:category_posts', args=[category['category__slug']]
+        )))
+    author = posts.values('author__username').annotate(
+        total=Count('pk')).order_by('-total').first()
+    if author:
+        feeds.append(('profile', reverse(
+            'blog:profile', args=[author['author__username']]
+        )))
+    scenarios = [
+        Scenario(name, 'GET', url, ANONYMOUS) for name, url in feeds
+    ] + [
+        Scenario(f'{name}_uncached', 'GET', url, ANONYMOUS, uncached=True)
+        for name, url in feeds
+    ] + [
+        Scenario(
+            'search', 'GET',
+            f'{reverse("blog:search")}?{urlencode({"q": SEARCH_QUERY})}',
+            ANONYMOUS
+        ),
+        Scenario('api_posts', 'GET', reverse('api:post-list'), ANONYMOUS),
+    ]
+    post = posts.order_by('-comment_count', 'pk').first()
+    if post:
+        scenarios += [
+            Scenario('detail', 'GET', reverse(
+                'blog:post_detail', args=[post.pk]), ANONYMOUS),
+            Scenario('comment_create', 'POST', reverse(
+                'blog:add_comment', args=[post.pk]), USER,
+                {'text': COMMENT_TEXT}),
+        ]
+    scenarios += [
+        Scenario('admin_posts', 'GET',
+                 reverse('admin:blog_post_changelist'), ADMIN),
+        Scenario('admin_comments', 'GET',
+                 reverse('admin:blog_comment_changelist'), ADMIN),
+    ]
+    return scenarios
+
+
+def get_users(create_admin):
+    """Пользователи для сценариев с авторизацией.
+
+    Администратор создаётся только по `create_admin`, иначе берётся
+    существующий; без него сценарии админки пропускаются.
+    """
+    admin = User.objects.filter(is_superuser=True).order_by('pk').first()
+    if admin is None and create_admin:
+        admin = User.objects.create_superuser('loadtest_admin')
+    return {
+        ANONYMOUS: None,
+        USER: User.objects.filter(
+            is_superuser=False, is_active=True
+        ).order_by('pk').first(),
+        ADMIN: admin,
+    }
+
+
+def get_clients(users):
+    clients = {}
+    for auth, user in users.items():
+        if auth != ANONYMOUS and user is None:
+            continue
+        client = Client(
+            raise_request_exception=False, SERVER_NAME='localhost'
+        )
+        if user is not None:
+            client.force_login(user)
+        clients[auth] = client
+    return clients
+
+
+def summarize(latencies, errors, elapsed):
+    """Перцентили в миллисекундах и пропускная способность.
+
+    `errors` — Counter статусов ответов с ошибкой.
+    """
+    latencies = sorted(latency * 1000 for latency in latencies)
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    else:
+        cuts = latencies * 99
+    summary = {
+        f'p{percentile}': round(cuts[percentile - 1], 2)
+        for percentile in PERCENTILES
+    }
+    summary.update(
+        requests=len(latencies),
+        errors=sum(errors.values()),
+        mean=round(statistics.fmean(latencies), 2),
+        rps=round(len(latencies) / elapsed, 1) if elapsed else None,
+    )
+    if errors:
+        summary['error_statuses'] = {
+            str(status): count for status, count in sorted(errors.items())
+        }
+    return summary
+
+
+def get_url(scenario):
+    """URL запроса; для сценариев `uncached` — с уникальным параметром.
+
+    Страницы с посторонними параметрами запроса не кешируются, поэтому
+    такой запрос всегда строится заново и не оставляет записей в кеше.
+    """
+    if not scenario.uncached:
+        return scenario.url
+    separator = '&' if '?' in scenario.url else '?'
+    return f'{scenario.url}{separator}{UNCACHED_PARAM}={uuid.uuid4().hex}'
+
+
+def send(client, scenario):
+    if scenario.method == 'POST':
+        return client.post(get_url(scenario), scenario.data)
+    return client.get(get_url(scenario))
+
+
+def warm_up(client, scenario):
+    """Первый, «холодный» запрос: по нему считаются запросы к базе."""
+    with CaptureQueriesContext(connection) as context:
+        send(client, scenario)
+    return len(context.captured_queries)
+
+
+def run_client(scenario, client, requests):
+    """Запросы через тестовый клиент Django в текущем процессе."""
+    queries = warm_up(client, scenario)
+    latencies, errors = [], Counter()
+    started = time.perf_counter()
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = send(client, scenario)
+        latencies.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors[response.status_code] += 1
+    summary = summarize(latencies, errors, time.perf_counter() - started)
+    summary['queries'] = queries
+    return summary
+
+
+def get_http_headers(client, scenario):
+    """Cookie сессии и CSRF-токен для запросов по HTTP."""
+    cookies = {
+        name: morsel.value for name, morsel in client.cookies.items()
+    }
+    headers = {}
+    if scenario.method == 'POST':
+        request = HttpRequest()
+        headers['X-CSRFToken'] = get_token(request)
+        cookies[settings.CSRF_COOKIE_NAME] = request.META['CSRF_COOKIE']
+        headers['Content-Type'] = 'application/x-www-form-urlencoded'
+    if cookies:
+        headers['Cookie'] = '; '.join(
+            f'{name}={value}' for name, value in cookies.items()
+        )
+    return headers
+
+
+def http_worker(address, scenario, body, headers, requests):
+    """Отправляет `requests` запросов по одному соединению.
+
+    Первый запрос прогревает соединение и в замеры не попадает.
+    Возвращает задержки и Counter статусов ответов с ошибкой.
+    """
+    host, port = address
+    conn = http.client.HTTPConnection(host, port, timeout=HTTP_TIMEOUT)
+    latencies, errors = [], Counter()
+    for number in range(requests + 1):
+        start = time.perf_counter()
+        conn.request(
+            scenario.method, get_url(scenario), body=body, headers=headers
+        )
+        response = conn.getresponse()
+        response.read()
+        if number:
+            latencies.append(time.perf_counter() - start)
+            if response.status >= 400:
+                errors[response.status] += 1
+    conn.close()
+    return latencies, errors
+
+
+def run_http(scenario, client, requests, address, pool, concurrency):
+    """Запросы по HTTP из `concurrency` процессов одновременно.
+
+    SQLite допускает только одну пишущую транзакцию, и параллельные
+    POST-запросы получали бы «database is locked», поэтому для SQLite
+    пишущие сценарии отправляются из одного процесса.
+    """
+    queries = warm_up(client, scenario)
+    body = urlencode(scenario.data) if scenario.data else None
+    headers = get_http_headers(client, scenario)
+    if scenario.method != 'GET' and connection.vendor == 'sqlite':
+        concurrency = 1
+    shares = [
+        requests // concurrency + (worker < requests % concurrency)
+        for worker in range(concurrency)
+    ]
+    started = time.perf_counter()
+    results = pool.starmap(http_worker, [
+        (address, scenario, body, headers, share)
+        for share in shares if share
+    ])
+    elapsed = time.perf_counter() - started
+    summary = summarize(
+        [latency for latencies, _ in results for latency in latencies],
+        sum((errors for _, errors in results), Counter()),
+        elapsed
+    )
+    summary['queries'] = queries
+    return summary
+
+
+def start_server():
+    """Запускает WSGI-сервер на свободном порту в отдельном процессе."""
+    from django.core.servers.basehttp import (ThreadedWSGIServer,
+                                              WSGIRequestHandler)
+    from django.core.wsgi import get_wsgi_application
+
+    class QuietHandler(WSGIRequestHandler):
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+    server.set_app(get_wsgi_application())
+    connections.close_all()
+    process = multiprocessing.Process(target=server.serve_forever)
+    process.daemon = True
+    process.start()
+    server.socket.close()
+    return process, server.server_address
+
+
+def make_report(driver, options, results):
+    return {
+        'meta': {
+            'driver': driver,
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'posts': Post.objects.count(),
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        },
+        'scenarios': results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Сравнивает p95 с базовым прогоном.
+
+    Возвращает строки сравнения и список регрессий: сценариев,
+    где p95 вырос больше чем на `tolerance`.
+    """
+    rows, regressions = [], []
+    for name, current in report['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if not previous or not previous['p95']:
+            continue
+        change = current['p95'] / previous['p95'] - 1
+        rows.append((name, previous['p95'], current['p95'], change))
+        if change > tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+        file.write('\n')
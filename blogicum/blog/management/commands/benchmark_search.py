@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from blog.models import Post
+from blog.search import POST_INDEX, build_match_query
+
+DEFAULT_QUERIES = ('байкал', 'погода', 'python', 'zzzz')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск по индексу FTS5 с поиском LIKE по заголовкам '
+        'и текстам публикаций на текущей базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'queries',
+            nargs='*',
+            default=DEFAULT_QUERIES,
+            help='Поисковые запросы.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Сколько раз выполнять каждый запрос.'
+        )
+
+    def measure(self, queryset, repeat):
+        """Лучшее время из `repeat` запусков: количество и первая страница."""
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = queryset.count()
+            list(queryset[:10])
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return count, best * 1000
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        posts = Post.objects.all()
+        self.stdout.write(f'Публикаций: {posts.count()}')
+        self.stdout.write(
+            f'{"запрос":<16}{"LIKE, мс":>12}{"найдено":>10}'
+            f'{"FTS5, мс":>12}{"найдено":>10}'
+        )
+        for query in options['queries']:
+            like = posts.filter(
+                Q(title__icontains=query) | Q(text__icontains=query)
+            ).order_by('-pub_date')
+            fts = POST_INDEX.rank(posts, build_match_query(query))
+            like_count, like_ms = self.measure(like, repeat)
+            fts_count, fts_ms = self.measure(fts, repeat)
+            self.stdout.write(
+                f'{query:<16}{like_ms:>12.1f}{like_count:>10}'
+                f'{fts_ms:>12.1f}{fts_count:>10}'
+            )
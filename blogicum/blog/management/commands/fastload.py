@@ -0,0 +1,161 @@
+import gzip
+import json
+from collections import defaultdict
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from blog.bulk import fill_auto_dates, insert_raw
+from blog.cache import GLOBAL_SCOPE, bump_generations
+
+READ_SIZE = 1024 * 64
+BATCH_SIZE = 2000
+
+
+def skip_separators(buffer, position):
+    while position < len(buffer) and buffer[position] in ' \t\r\n,':
+        position += 1
+    return position
+
+
+def iter_json_array(stream, read_size=READ_SIZE):
+    """Элементы JSON-массива верхнего уровня по одному.
+
+    Файл читается кусками по `read_size`, в памяти держится только
+    текущий кусок и ещё не разобранный элемент.
+    """
+    decoder = json.JSONDecoder()
+    buffer = stream.read(read_size).lstrip()
+    if not buffer.startswith('['):
+        raise DeserializationError('Ожидался JSON-массив.')
+    position = 1
+    while True:
+        chunk = stream.read(read_size)
+        buffer = buffer[position:] + chunk
+        position = skip_separators(buffer, 0)
+        while position < len(buffer):
+            if buffer[position] == ']':
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                if not chunk:
+                    raise DeserializationError(str(error))
+                break
+            yield item
+            position = skip_separators(buffer, position)
+        if not chunk:
+            raise DeserializationError('Неожиданный конец файла.')
+
+
+def open_fixture(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает JSON-фикстуру: читает файл потоково '
+        'и вставляет объекты пачками в одной транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к .json или .json.gz.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько объектов одной модели вставлять за раз.'
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='База данных для загрузки.'
+        )
+
+    def handle(self, *args, **options):
+        self.using = options['database']
+        self.batch_size = options['batch_size']
+        self.connection = connections[self.using]
+        self.models = set()
+        self.loaded = 0
+        pending = defaultdict(list)
+        try:
+            with open_fixture(options['fixture']) as stream, \
+                    transaction.atomic(using=self.using), \
+                    self.connection.constraint_checks_disabled():
+                objects = Deserializer(
+                    iter_json_array(stream), using=self.using
+                )
+                for obj in objects:
+                    model = type(obj.object)
+                    pending[model].append(obj)
+                    if len(pending[model]) >= self.batch_size:
+                        self.insert(model, pending.pop(model))
+                for model, batch in pending.items():
+                    self.insert(model, batch)
+                self.connection.check_constraints(table_names=[
+                    model._meta.db_table for model in self.models
+                ])
+                self.reset_sequences()
+        except (OSError, DeserializationError) as error:
+            raise CommandError(f'Не удалось загрузить фикстуру: {error}')
+        if apps.get_model('blog', 'Post') in self.models:
+            call_command('recount_comments', stdout=self.stdout)
+        bump_generations([GLOBAL_SCOPE])
+        self.stdout.write(
+            self.style.SUCCESS(f'Загружено объектов: {self.loaded}')
+        )
+
+    def insert(self, model, batch):
+        """Вставляет пачку одной модели, сохраняя значения из фикстуры.
+
+        Новые строки вставляются через insert_raw, уже существующие
+        обновляются по одной, как при loaddata.
+        """
+        existing = set(model._base_manager.using(self.using).filter(
+            pk__in=[obj.object.pk for obj in batch]
+        ).values_list('pk', flat=True))
+        new = []
+        for obj in batch:
+            if obj.object.pk in existing:
+                fill_auto_dates(obj.object)
+                obj.object.save_base(raw=True, using=self.using)
+            else:
+                new.append(obj.object)
+        insert_raw(model, new, using=self.using)
+        self.insert_m2m(model, batch)
+        self.models.add(model)
+        self.loaded += len(batch)
+
+    def insert_m2m(self, model, batch):
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            if not through._meta.auto_created:
+                continue
+            source = field.m2m_field_name() + '_id'
+            target = field.m2m_reverse_field_name() + '_id'
+            rows = [
+                through(**{source: obj.object.pk, target: value})
+                for obj in batch
+                for value in (obj.m2m_data or {}).get(field.name, ())
+            ]
+            if rows:
+                through._base_manager.using(self.using).bulk_create(
+                    rows, batch_size=self.batch_size, ignore_conflicts=True
+                )
+                self.models.add(through)
+
+    def reset_sequences(self):
+        statements = self.connection.ops.sequence_reset_sql(
+            no_style(), list(self.models)
+        )
+        with self.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,241 @@
+import itertools
+import random
+from bisect import bisect
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from blog.bulk import insert_raw
+from blog.cache import GLOBAL_SCOPE, bump_generations
+from blog.models import Category, Comment, Location, Post, User
+
+BATCH_SIZE = 2000
+PASSWORD = 'blogicum'
+HISTORY_DAYS = 3 * 365
+SCHEDULED_DAYS = 30
+AUTHOR_SKEW = 1.2
+POST_SKEW = 1.1
+SCHEDULED_SHARE = 0.03
+UNPUBLISHED_POST_SHARE = 0.05
+UNPUBLISHED_CATEGORY_SHARE = 0.2
+UNPUBLISHED_LOCATION_SHARE = 0.2
+NO_LOCATION_SHARE = 0.3
+
+
+def power_law_weights(n, skew):
+    """Накопленные веса закона Ципфа: i-й элемент в i**skew раз реже."""
+    return list(itertools.accumulate(
+        1 / (rank ** skew) for rank in range(1, n + 1)
+    ))
+
+
+def next_pk(model):
+    return (model.objects.aggregate(pk=Max('pk'))['pk'] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт воспроизводимый набор данных для нагрузочного '
+        'тестирования: авторы и посты распределены по степенному закону, '
+        'часть постов отложена или снята с публикации.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--categories', type=int, default=12)
+        parser.add_argument('--locations', type=int, default=30)
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='При одинаковом seed на пустой базе данные совпадают.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько строк вставлять за раз.'
+        )
+
+    def handle(self, *args, **options):
+        if options['posts'] and not (
+                options['users'] and options['categories']):
+            raise CommandError('Для постов нужны авторы и категории.')
+        self.rng = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now().replace(microsecond=0)
+        with transaction.atomic():
+            users = self.create_users(options['users'])
+            categories = self.create_categories(options['categories'])
+            locations = self.create_locations(options['locations'])
+            self.create_posts_and_comments(
+                options['posts'], options['comments'],
+                users, categories, locations
+            )
+        bump_generations([GLOBAL_SCOPE])
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {options["users"]}, '
+            f'постов {options["posts"]}, '
+            f'комментариев {options["comments"]}'
+        ))
+
+    def insert(self, model, objs):
+        for start in range(0, len(objs), self.batch_size):
+            insert_raw(model, objs[start:start + self.batch_size])
+
+    def random_date(self, days):
+        return self.now - timedelta(seconds=self.rng.randrange(days * 86400))
+
+    def create_users(self, count):
+        start = next_pk(User)
+        password = make_password(PASSWORD)
+        users = [
+            User(
+                pk=start + i,
+                username=f'{self.fake.user_name()}_{start + i}',
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                email=self.fake.email(),
+                password=password,
+                date_joined=self.random_date(HISTORY_DAYS),
+            )
+            for i in range(count)
+        ]
+        self.insert(User, users)
+        return [user.pk for user in users]
+
+    def create_categories(self, count):
+        start = next_pk(Category)
+        categories = [
+            Category(
+                pk=start + i,
+                title=self.fake.sentence(nb_words=2)[:-1],
+                description=self.fake.paragraph(),
+                slug=f'category-{start + i}',
+                is_published=(
+                    self.rng.random() >= UNPUBLISHED_CATEGORY_SHARE
+                ),
+                created_at=self.random_date(HISTORY_DAYS),
+            )
+            for i in range(count)
+        ]
+        self.insert(Category, categories)
+        return [category.pk for category in categories]
+
+    def create_locations(self, count):
+        start = next_pk(Location)
+        locations = [
+            Location(
+                pk=start + i,
+                name=self.fake.city(),
+                is_published=(
+                    self.rng.random() >= UNPUBLISHED_LOCATION_SHARE
+                ),
+                created_at=self.random_date(HISTORY_DAYS),
+            )
+            for i in range(count)
+        ]
+        self.insert(Location, locations)
+        return [location.pk for location in locations]
+
+    def create_posts_and_comments(self, n_posts, n_comments,
+                                  users, categories, locations):
+        """Посты и комментарии к ним.
+
+        Комментарии распределяются заранее, чтобы сразу записать
+        comment_count. «Горячие» посты выбираются случайно, а не
+        по дате, и получают основную часть комментариев.
+        """
+        if not n_posts:
+            return
+        start = next_pk(Post)
+        hot_order = list(range(n_posts))
+        self.rng.shuffle(hot_order)
+        post_weights = power_law_weights(n_posts, POST_SKEW)
+        comment_posts = [
+            hot_order[bisect(post_weights, value)]
+            for value in (
+                self.rng.random() * post_weights[-1]
+                for _ in range(n_comments)
+            )
+        ]
+        comment_counts = [0] * n_posts
+        for index in comment_posts:
+            comment_counts[index] += 1
+
+        author_weights = power_law_weights(len(users), AUTHOR_SKEW)
+        pub_dates = []
+        batch = []
+        for index in range(n_posts):
+            if self.rng.random() < SCHEDULED_SHARE:
+                pub_date = self.now + timedelta(
+                    seconds=self.rng.randrange(1, SCHEDULED_DAYS * 86400)
+                )
+                created_at = self.now
+            else:
+                pub_date = self.random_date(HISTORY_DAYS)
+                created_at = pub_date
+            pub_dates.append(pub_date)
+            batch.append(Post(
+                pk=start + index,
+                title=self.fake.sentence(nb_words=4)[:-1],
+                text='\n\n'.join(self.fake.paragraphs(
+                    nb=self.rng.randint(1, 4)
+                )),
+                pub_date=pub_date,
+                author_id=self.rng.choices(
+                    users, cum_weights=author_weights
+                )[0],
+                category_id=self.rng.choice(categories),
+                location_id=(
+                    self.rng.choice(locations)
+                    if locations and self.rng.random() >= NO_LOCATION_SHARE
+                    else None
+                ),
+                is_published=self.rng.random() >= UNPUBLISHED_POST_SHARE,
+                created_at=created_at,
+                updated_at=created_at,
+                changed_at=pub_date,
+                comment_count=comment_counts[index],
+            ))
+            if len(batch) >= self.batch_size:
+                self.insert(Post, batch)
+                batch = []
+        self.insert(Post, batch)
+
+        self.create_comments(
+            comment_posts, start, pub_dates, users, author_weights
+        )
+
+    def create_comments(self, comment_posts, post_start, pub_dates,
+                        users, author_weights):
+        start = next_pk(Comment)
+        batch = []
+        for number, index in enumerate(comment_posts):
+            delay = self.rng.expovariate(1 / 86400)
+            created_at = min(
+                pub_dates[index] + timedelta(seconds=delay), self.now
+            )
+            batch.append(Comment(
+                pk=start + number,
+                text=self.fake.sentence(nb_words=self.rng.randint(3, 25)),
+                post_id=post_start + index,
+                author_id=self.rng.choices(
+                    users, cum_weights=author_weights
+                )[0],
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+            if len(batch) >= self.batch_size:
+                self.insert(Comment, batch)
+                batch = []
+        self.insert(Comment, batch)
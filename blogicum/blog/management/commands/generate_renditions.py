@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import process_post_image
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт адаптивные копии изображений публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать копии, даже если они уже есть.'
+        )
+
+    def handle(self, *args, **options):
+        post_ids = Post.objects.exclude(image='').values_list(
+            'pk', flat=True
+        )
+        processed = 0
+        for post_id in post_ids.iterator():
+            processed += process_post_image(post_id, force=options['force'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано изображений: {processed}')
+        )
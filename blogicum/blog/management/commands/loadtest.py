@@ -0,0 +1,190 @@
+import multiprocessing
+import os
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from blog.loadtest import (build_scenarios, compare, get_clients, get_users,
+                           isolated_database, load_report, make_report,
+                           run_client, run_http, save_report, start_server)
+
+REQUESTS = 200
+TOLERANCE = 0.2
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест страниц блога: лента, категория, профиль, пост, '
+        'добавление комментария, поиск, API и списки в админке. '
+        'По умолчанию создаёт временную базу со сгенерированными данными.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--driver',
+            choices=('client', 'http'),
+            default='client',
+            help=(
+                'client — тестовый клиент Django в этом процессе, '
+                'http — WSGI-сервер и несколько процессов-клиентов.'
+            )
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=REQUESTS,
+            help='Сколько запросов отправлять в каждом сценарии.'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Количество процессов-клиентов для --driver http.'
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            help='Запустить только этот сценарий; можно указать несколько.'
+        )
+        parser.add_argument(
+            '--in-place',
+            action='store_true',
+            help=(
+                'Использовать текущую базу без генерации данных. '
+                'Сценарий comment_create добавит в неё комментарии.'
+            )
+        )
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=100000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            help='Сохранить результаты в JSON как базовый прогон.'
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON базового прогона для сравнения.'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=TOLERANCE,
+            help='Допустимый рост p95 относительно базового прогона.'
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['requests'] < 1:
+            raise CommandError('Нужен хотя бы один запрос и один процесс.')
+        if options['driver'] == 'http' and options['in_place'] and (
+                connection.vendor == 'sqlite'
+                and connection.is_in_memory_db()):
+            raise CommandError(
+                'База SQLite в памяти недоступна процессу HTTP-сервера.'
+            )
+        baseline = options['compare'] and load_report(options['compare'])
+        if options['in_place']:
+            report = self.run(options)
+        else:
+            with isolated_database():
+                call_command(
+                    'generate_blog_data',
+                    users=options['users'],
+                    posts=options['posts'],
+                    comments=options['comments'],
+                    seed=options['seed'],
+                    stdout=self.stdout,
+                )
+                report = self.run(options)
+        self.print_report(report)
+        if options['output']:
+            save_report(report, options['output'])
+        if baseline:
+            self.compare(report, baseline, options['tolerance'])
+
+    def run(self, options):
+        cache.clear()
+        clients = get_clients(get_users(create_admin=not options['in_place']))
+        scenarios = [
+            scenario for scenario in build_scenarios()
+            if scenario.auth in clients and (
+                not options['scenario'] or scenario.name in options['scenario']
+            )
+        ]
+        if not scenarios:
+            raise CommandError('Нет сценариев для запуска.')
+        if options['driver'] == 'client':
+            results = {
+                scenario.name: run_client(
+                    scenario, clients[scenario.auth], options['requests']
+                )
+                for scenario in scenarios
+            }
+        else:
+            results = self.run_http(scenarios, clients, options)
+        for scenario in scenarios:
+            results[scenario.name].update(
+                method=scenario.method, url=scenario.url
+            )
+        return make_report(options['driver'], options, results)
+
+    def run_http(self, scenarios, clients, options):
+        server, address = start_server()
+        try:
+            with multiprocessing.Pool(options['concurrency']) as pool:
+                return {
+                    scenario.name: run_http(
+                        scenario, clients[scenario.auth],
+                        options['requests'], address,
+                        pool, options['concurrency']
+                    )
+                    for scenario in scenarios
+                }
+        finally:
+            server.terminate()
+            server.join()
+
+    def print_report(self, report):
+        meta = report['meta']
+        self.stdout.write(
+            f'Драйвер: {meta["driver"]}, публикаций: {meta["posts"]}, '
+            f'запросов на сценарий: {meta["requests"]}'
+        )
+        self.stdout.write(
+            f'{"сценарий":<16}{"p50, мс":>10}{"p95, мс":>10}'
+            f'{"p99, мс":>10}{"RPS":>10}{"SQL":>6}{"ошибок":>8}'
+        )
+        for name, result in report['scenarios'].items():
+            self.stdout.write(
+                f'{name:<16}{result["p50"]:>10.1f}{result["p95"]:>10.1f}'
+                f'{result["p99"]:>10.1f}{result["rps"]:>10.1f}'
+                f'{result["queries"]:>6}{result["errors"]:>8}'
+            )
+        for name, result in report['scenarios'].items():
+            if result.get('error_statuses'):
+                self.stderr.write(f'{name}: ответы с ошибкой ' + ', '.join(
+                    f'{status} — {count}'
+                    for status, count in result['error_statuses'].items()
+                ))
+
+    def compare(self, report, baseline, tolerance):
+        if baseline['meta']['driver'] != report['meta']['driver']:
+            self.stderr.write(
+                'Базовый прогон сделан другим драйвером, '
+                'сравнение может быть неточным.'
+            )
+        rows, regressions = compare(report, baseline, tolerance)
+        self.stdout.write(
+            f'{"сценарий":<16}{"было p95":>10}{"стало p95":>11}'
+            f'{"изменение":>11}'
+        )
+        for name, before, after, change in rows:
+            self.stdout.write(
+                f'{name:<16}{before:>10.1f}{after:>11.1f}{change:>+11.0%}'
+            )
+        if regressions:
+            raise CommandError(
+                'p95 вырос больше допустимого: ' + ', '.join(regressions)
+            )
@@ -0,0 +1,97 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+import blog.models
+
+TOKENIZE = "tokenize='unicode61 remove_diacritics 2'"
+
+CREATE_POST_INDEX = (
+    "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+    "title, text, content='blog_post', content_rowid='id', "
+    f"{TOKENIZE})",
+    "CREATE TRIGGER blog_post_fts_insert AFTER INSERT ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); END",
+    "CREATE TRIGGER blog_post_fts_delete AFTER DELETE ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); END",
+    "CREATE TRIGGER blog_post_fts_update "
+    "AFTER UPDATE OF title, text ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); "
+    "INSERT INTO blog_post_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); END",
+    "INSERT INTO blog_post_fts(blog_post_fts, rank) "
+    "VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "INSERT INTO blog_post_fts(blog_post_fts) VALUES ('rebuild')",
+)
+DROP_POST_INDEX = (
+    'DROP TRIGGER blog_post_fts_insert',
+    'DROP TRIGGER blog_post_fts_delete',
+    'DROP TRIGGER blog_post_fts_update',
+    'DROP TABLE blog_post_fts',
+)
+
+CREATE_COMMENT_INDEX = (
+    "CREATE VIRTUAL TABLE blog_comment_fts USING fts5("
+    "text, content='blog_comment', content_rowid='id', "
+    f"{TOKENIZE})",
+    "CREATE TRIGGER blog_comment_fts_insert AFTER INSERT ON blog_comment "
+    "BEGIN INSERT INTO blog_comment_fts(rowid, text) "
+    "VALUES (new.id, new.text); END",
+    "CREATE TRIGGER blog_comment_fts_delete AFTER DELETE ON blog_comment "
+    "BEGIN INSERT INTO blog_comment_fts(blog_comment_fts, rowid, text) "
+    "VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER blog_comment_fts_update "
+    "AFTER UPDATE OF text ON blog_comment BEGIN "
+    "INSERT INTO blog_comment_fts(blog_comment_fts, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "INSERT INTO blog_comment_fts(rowid, text) VALUES (new.id, new.text); "
+    "END",
+    "INSERT INTO blog_comment_fts(blog_comment_fts) VALUES ('rebuild')",
+)
+DROP_COMMENT_INDEX = (
+    'DROP TRIGGER blog_comment_fts_insert',
+    'DROP TRIGGER blog_comment_fts_delete',
+    'DROP TRIGGER blog_comment_fts_update',
+    'DROP TABLE blog_comment_fts',
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_comment_updated_at_deletedobject'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_POST_INDEX, DROP_POST_INDEX),
+        migrations.RunSQL(CREATE_COMMENT_INDEX, DROP_COMMENT_INDEX),
+        migrations.CreateModel(
+            name='PostSearchIndex',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='blog.post')),
+                ('title', models.TextField()),
+                ('text', models.TextField()),
+                ('document', blog.models.SearchDocumentField(db_column='blog_post_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'blog_post_fts',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CommentSearchIndex',
+            fields=[
+                ('comment', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='blog.comment')),
+                ('text', models.TextField()),
+                ('document', blog.models.SearchDocumentField(db_column='blog_comment_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'blog_comment_fts',
+                'managed': False,
+            },
+        ),
+    ]
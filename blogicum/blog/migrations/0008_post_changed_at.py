@@ -0,0 +1,62 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:42
+
+from django.db import migrations, models
+from django.db.models.functions import Greatest
+
+import blog.models
+
+# SQLite пересоздаёт таблицу при добавлении столбца, и триггеры
+# полнотекстового индекса из 0007_full_text_search удаляются вместе
+# со старой таблицей: их нужно создать заново.
+DROP_POST_TRIGGERS = (
+    'DROP TRIGGER IF EXISTS blog_post_fts_insert',
+    'DROP TRIGGER IF EXISTS blog_post_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_post_fts_update',
+)
+CREATE_POST_TRIGGERS = (
+    "CREATE TRIGGER blog_post_fts_insert AFTER INSERT ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); END",
+    "CREATE TRIGGER blog_post_fts_delete AFTER DELETE ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); END",
+    "CREATE TRIGGER blog_post_fts_update "
+    "AFTER UPDATE OF title, text ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); "
+    "INSERT INTO blog_post_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); END",
+)
+
+
+def fill_changed_at(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.using(schema_editor.connection.alias).update(
+        changed_at=Greatest('updated_at', 'pub_date')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_full_text_search'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DROP_POST_TRIGGERS, CREATE_POST_TRIGGERS),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_updated_at_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='changed_at',
+            field=blog.models.ChangedAtField(not_before='pub_date', verbose_name='Изменено в ленте изменений'),
+        ),
+        migrations.RunPython(fill_changed_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['changed_at', 'id'], name='post_changed_at_idx'),
+        ),
+        migrations.RunSQL(CREATE_POST_TRIGGERS, DROP_POST_TRIGGERS),
+    ]
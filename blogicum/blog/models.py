@@ -24,6 +24,37 @@ class PublishedBaseModel(models.Model):
         abstract = True
 
 
+class ChangedAtField(models.DateTimeField):
+    """Время изменения объекта для ленты изменений API.
+
+    Как `auto_now`, проставляется при каждом сохранении, но не раньше
+    значения поля `not_before`: отложенная публикация попадает в ленту,
+    когда наступает дата публикации.
+    """
+
+    def __init__(self, *args, not_before=None, **kwargs):
+        self.not_before = not_before
+        kwargs['auto_now'] = True
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        del kwargs['auto_now']
+        if self.not_before:
+            kwargs['not_before'] = self.not_before
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = super().pre_save(model_instance, add)
+        not_before = self.not_before and getattr(
+            model_instance, self.not_before
+        )
+        if not_before and not_before > value:
+            value = not_before
+            setattr(model_instance, self.attname, value)
+        return value
+
+
 class Category(PublishedBaseModel):
     """Тематическая категория"""
     title = models.CharField(
@@ -111,6 +142,25 @@ class Post(PublishedBaseModel):
         upload_to='posts_images',
         blank=True
     )
+    image_renditions = models.JSONField(
+        'Копии фото',
+        default=dict,
+        blank=True,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+    changed_at = ChangedAtField(
+        not_before='pub_date',
+        verbose_name='Изменено в ленте изменений'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Комментариев'
+    )
 
     class Meta:
         verbose_name = 'публикация'
@@ -118,6 +168,25 @@ class Post(PublishedBaseModel):
         ordering = (
             '-pub_date',
         )
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_pub_date_idx'
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('changed_at', 'id'),
+                name='post_changed_at_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title
@@ -140,6 +209,10 @@ class Comment(models.Model):
         auto_now_add=True,
         verbose_name='Дата и время публикации'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -150,3 +223,99 @@ class Comment(models.Model):
         ordering = ('created_at',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('updated_at', 'id'),
+                name='comment_updated_at_idx'
+            ),
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_at_idx'
+            ),
+        )
+
+
+class SearchDocumentField(models.TextField):
+    """Скрытый столбец FTS5 с именем таблицы; поддерживает lookup `match`."""
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class PostSearchIndex(models.Model):
+    """Строка полнотекстового индекса публикаций.
+
+    Таблица FTS5 и триггеры, которые её обновляют, создаются
+    миграцией 0007_full_text_search.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_index'
+    )
+    title = models.TextField()
+    text = models.TextField()
+    document = SearchDocumentField(db_column='blog_post_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_fts'
+
+
+class CommentSearchIndex(models.Model):
+    """Строка полнотекстового индекса комментариев."""
+    comment = models.OneToOneField(
+        Comment,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_index'
+    )
+    text = models.TextField()
+    document = SearchDocumentField(db_column='blog_comment_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'blog_comment_fts'
+
+
+class DeletedObject(models.Model):
+    """Запись об удалённом посте или комментарии для ленты изменений."""
+    POST = 'post'
+    COMMENT = 'comment'
+    KINDS = (
+        (POST, 'Пост'),
+        (COMMENT, 'Комментарий'),
+    )
+
+    kind = models.CharField(
+        max_length=16,
+        choices=KINDS,
+        verbose_name='Тип'
+    )
+    object_id = models.PositiveBigIntegerField(
+        verbose_name='Идентификатор'
+    )
+    deleted_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Удалено'
+    )
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'удалённый объект'
+        verbose_name_plural = 'Удалённые объекты'
+
+    def __str__(self):
+        return f'{self.get_kind_display()} {self.object_id}'
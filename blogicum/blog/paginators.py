@@ -0,0 +1,190 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, InvalidPage, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from . import tasks
+from .cache import defer_count_refresh, get_count, set_count
+
+
+class CursorPage(Sequence):
+    """Страница курсорной пагинации.
+
+    В отличие от `django.core.paginator.Page` не знает ни номера
+    страницы, ни общего количества объектов.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page of %s objects>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинация по ключу (keyset) вместо OFFSET.
+
+    Порядок `ordering` должен быть уникальным: последним полем
+    обычно идёт первичный ключ. Стоимость любой страницы одинакова,
+    COUNT(*) не выполняется.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [
+            object_list.model._meta.get_field(name.lstrip('-'))
+            for name in self.ordering
+        ]
+
+    def encode_cursor(self, obj, backwards=False):
+        position = [field.value_to_string(obj) for field in self.fields]
+        payload = json.dumps({'p': position, 'b': backwards})
+        return base64.urlsafe_b64encode(
+            payload.encode()
+        ).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)
+            ))
+            if len(payload['p']) != len(self.fields):
+                raise ValueError
+            position = [
+                field.to_python(value)
+                for field, value in zip(self.fields, payload['p'])
+            ]
+            return position, bool(payload['b'])
+        except (binascii.Error, ValueError, TypeError,
+                KeyError, ValidationError):
+            raise InvalidPage('Некорректный курсор')
+
+    def _ordering(self, backwards):
+        if not backwards:
+            return self.ordering
+        return tuple(
+            name[1:] if name.startswith('-') else '-' + name
+            for name in self.ordering
+        )
+
+    def _after(self, ordering, position):
+        """Условие «строго после позиции» для лексикографического порядка.
+
+        Нестрогое условие по первому полю дублирует OR-условие,
+        но позволяет базе начать обход индекса сразу с позиции.
+        """
+        condition = Q()
+        equal = Q()
+        for name, value in zip(ordering, position):
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            name = name.lstrip('-')
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        first = ordering[0]
+        lookup = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{lookup}': position[0]}) & condition
+
+    def page(self, cursor=None):
+        position, backwards = None, False
+        if cursor:
+            position, backwards = self.decode_cursor(cursor)
+        ordering = self._ordering(backwards)
+        queryset = self.object_list.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if backwards:
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+        next_cursor = previous_cursor = None
+        if object_list and has_next:
+            next_cursor = self.encode_cursor(object_list[-1])
+        if object_list and has_previous:
+            previous_cursor = self.encode_cursor(
+                object_list[0], backwards=True
+            )
+        return CursorPage(object_list, self, next_cursor, previous_cursor)
+
+
+class CachedCountPaginator(Paginator):
+    """Постраничная пагинация с кешируемым COUNT(*) для больших лент.
+
+    Без `count_scope` количество считается точно. Ленты, где публикаций
+    не меньше COUNT_THRESHOLD, берут количество из кеша: устаревшее
+    значение отдаётся сразу, а пересчёт `count_lookups` ставится
+    в очередь фоновых задач. Если запрошенная страница оказалась
+    за концом ленты по закешированному количеству, оно пересчитывается
+    сразу: публикации могли появиться без сброса кеша, например
+    по расписанию.
+    """
+
+    def __init__(self, object_list, per_page, count_scope=None,
+                 count_lookups=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_scope = count_scope
+        self.count_lookups = count_lookups or {}
+        self.count_is_cached = False
+
+    @cached_property
+    def count(self):
+        if self.count_scope is None:
+            return super().count
+        cached = get_count(self.count_scope)
+        if cached is None:
+            return self.recount()
+        count, stale = cached
+        if stale:
+            defer_count_refresh(self.count_scope)
+            tasks.refresh_post_count.delay(
+                self.count_scope, self.count_lookups
+            )
+        self.count_is_cached = True
+        return count
+
+    def recount(self):
+        count = self.object_list.count()
+        set_count(self.count_scope, count)
+        self.count_is_cached = False
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.count_is_cached:
+                raise
+        self.recount()
+        return super().validate_number(number)
@@ -0,0 +1,16 @@
+from django.utils import timezone
+
+from .models import Post
+
+
+def get_query_set_post():
+    query_set_post = Post.objects.select_related(
+        'category',
+        'location',
+        'author',
+    ).filter(
+        is_published=True,
+        pub_date__lt=timezone.now(),
+        category__is_published=True
+    )
+    return query_set_post
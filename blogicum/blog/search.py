@@ -0,0 +1,81 @@
+import re
+
+from django.db import connection
+from django.db.models import F
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+TOKEN_RE = re.compile(r'\w+')
+MAX_TOKENS = 10
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+SNIPPET_TOKENS = 24
+
+
+def build_match_query(query):
+    """Запрос FTS5 из пользовательского ввода.
+
+    Каждое слово берётся в кавычки и ищется по префиксу, поэтому
+    синтаксис FTS5 (AND, NEAR, `*`, `:` и т.п.) во вводе не работает.
+    Пустая строка — если слов нет.
+    """
+    tokens = TOKEN_RE.findall(query)[:MAX_TOKENS]
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+class FullTextIndex:
+    """Полнотекстовый индекс FTS5 над таблицей модели.
+
+    Модель связана со строкой индекса через `relation`
+    (см. PostSearchIndex); поиск выполняется соединением с таблицей
+    индекса, ранжирование — по столбцу rank (bm25).
+    """
+
+    def __init__(self, table, relation, snippet_column):
+        self.table = table
+        self.relation = relation
+        self.snippet_column = snippet_column
+
+    def filter(self, queryset, match):
+        """Оставляет в queryset только найденные объекты."""
+        return queryset.filter(
+            **{f'{self.relation}__document__match': match}
+        )
+
+    def rank(self, queryset, match):
+        """Найденные объекты по убыванию релевантности."""
+        return self.filter(queryset, match).annotate(
+            rank=F(f'{self.relation}__rank')
+        ).order_by('rank', '-pk')
+
+    def snippets(self, match, pks):
+        """Фрагменты текста с подсвеченными совпадениями.
+
+        Текст экранируется, размечаются только совпадения.
+        """
+        pks = list(pks)
+        if not pks:
+            return {}
+        placeholders = ', '.join(['%s'] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, snippet({self.table}, {self.snippet_column}, '
+                f'%s, %s, %s, {SNIPPET_TOKENS}) FROM {self.table} '
+                f'WHERE {self.table} MATCH %s '
+                f'AND rowid IN ({placeholders})',
+                [HIGHLIGHT_START, HIGHLIGHT_END, '…', match, *pks]
+            )
+            return {
+                pk: mark_safe(escape(snippet).replace(
+                    HIGHLIGHT_START, '<mark>'
+                ).replace(HIGHLIGHT_END, '</mark>'))
+                for pk, snippet in cursor.fetchall()
+            }
+
+
+POST_INDEX = FullTextIndex(
+    'blog_post_fts', relation='search_index', snippet_column=1
+)
+COMMENT_INDEX = FullTextIndex(
+    'blog_comment_fts', relation='search_index', snippet_column=0
+)
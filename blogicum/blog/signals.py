@@ -0,0 +1,381 @@
+import threading
+
+from django.db.models import DateTimeField, F, OuterRef, Subquery, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import images, tasks
+from .cache import (
+    GLOBAL_SCOPE, INDEX_SCOPE, build_post_page_scopes, bump_generations,
+    category_scope, get_post_page_scopes, invalidate_counts, invalidate_post,
+    invalidate_post_cards, post_scope, profile_scope
+)
+from .models import Category, Comment, DeletedObject, Location, Post, User
+
+PUBLICATION_FIELDS = ('is_published', 'pub_date', 'category_id', 'author_id')
+
+
+class DeletingPosts(threading.local):
+    """Публикации, которые текущий поток удаляет вместе с комментариями.
+
+    `comment_ids`: id публикации -> id её удалённых комментариев.
+    """
+
+    def __init__(self):
+        self.comment_ids = {}
+
+
+deleting_posts = DeletingPosts()
+
+
+def now_value():
+    return Value(timezone.now(), output_field=DateTimeField())
+
+
+def changed_now():
+    """Post.changed_at для UPDATE: сейчас, но не раньше даты публикации."""
+    return Greatest(now_value(), F('pub_date'))
+
+
+def touch_posts(posts):
+    """Возвращает посты в ленту изменений API."""
+    posts.update(changed_at=changed_now())
+
+
+def touch_comments(comments):
+    """Возвращает комментарии в ленту изменений API.
+
+    `updated_at` не раньше `changed_at` поста: комментарии отложенного
+    поста попадут в ленту вместе с ним.
+    """
+    comments.update(updated_at=Greatest(now_value(), Subquery(
+        Post.objects.filter(pk=OuterRef('post_id')).values('changed_at')[:1]
+    )))
+
+
+def change_comment_count(post_id, delta):
+    """Меняет счётчик комментариев, не опуская его ниже нуля.
+
+    Пост с новым счётчиком снова попадает в ленту изменений API.
+    """
+    Post.objects.filter(pk=post_id).update(
+        comment_count=Greatest(F('comment_count') + delta, 0),
+        changed_at=changed_now()
+    )
+    invalidate_post(post_id)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw, **kwargs):
+    """Запоминает прежнюю публикацию, если комментарий переносят."""
+    if raw or instance._state.adding:
+        return
+    instance._previous_post_id = sender.objects.filter(
+        pk=instance.pk
+    ).values_list('post_id', flat=True).first()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if created:
+        change_comment_count(instance.post_id, 1)
+    elif previous_post_id and previous_post_id != instance.post_id:
+        change_comment_count(previous_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+    else:
+        bump_generations([post_scope(instance.post_id)])
+
+
+@receiver(pre_delete, sender=Comment)
+def forget_deleting_post(sender, instance, **kwargs):
+    """Сбрасывает отметку удаления публикации, оставшуюся с прошлого раза.
+
+    При каскадном удалении pre_delete всех комментариев приходит раньше,
+    чем pre_delete публикации, и отметка ставится уже после этого сигнала.
+    Если же удаление публикации откатилось, её отметка осталась бы
+    навсегда, и счётчик не уменьшался бы при удалении комментариев.
+    """
+    deleting_posts.comment_ids.pop(instance.post_id, None)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Уменьшает счётчик и записывает удаление комментария.
+
+    Если комментарий удаляется вместе с публикацией, счётчик и кеш
+    не трогаются, а запись об удалении делается одним запросом
+    на все комментарии в `log_deleted_post`.
+    """
+    comment_ids = deleting_posts.comment_ids.get(instance.post_id)
+    if comment_ids is not None:
+        comment_ids.append(instance.pk)
+        return
+    change_comment_count(instance.post_id, -1)
+    DeletedObject.objects.create(
+        kind=DeletedObject.COMMENT, object_id=instance.pk
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_post(sender, instance, raw, **kwargs):
+    """Запоминает прежние ленты публикации и поля, от которых они зависят.
+
+    Категория, автор и поля публикации читаются одним запросом.
+    """
+    instance._previous_page_scopes = []
+    instance._previous_publication = None
+    if raw or instance._state.adding:
+        return
+    previous = sender.objects.filter(pk=instance.pk).values(
+        'category__slug', 'author__username', *PUBLICATION_FIELDS
+    ).first()
+    if previous is None:
+        return
+    instance._previous_page_scopes = build_post_page_scopes(
+        instance.pk, previous['category__slug'], previous['author__username']
+    )
+    instance._previous_publication = {
+        field: previous[field] for field in PUBLICATION_FIELDS
+    }
+
+
+@receiver(pre_delete, sender=Post)
+def remember_post_page_scopes(sender, instance, **kwargs):
+    """Запоминает ленты, из которых пропадёт удаляемая публикация.
+
+    Публикация отмечается как удаляемая: её комментарии удаляются
+    каскадом после этого сигнала.
+    """
+    instance._previous_page_scopes = get_post_page_scopes(instance.pk)
+    deleting_posts.comment_ids[instance.pk] = []
+
+
+def is_publication_changed(instance):
+    return instance._previous_publication != {
+        field: getattr(instance, field) for field in PUBLICATION_FIELDS
+    }
+
+
+def get_saved_post_page_scopes(instance):
+    """Ленты сохранённой публикации.
+
+    Если категория и автор не менялись, ленты те же, что до сохранения,
+    и повторно читать их из базы не нужно.
+    """
+    previous = instance._previous_publication
+    if previous is not None and (
+            previous['category_id'] == instance.category_id
+            and previous['author_id'] == instance.author_id):
+        return instance._previous_page_scopes
+    return get_post_page_scopes(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_saved_post(sender, instance, raw, **kwargs):
+    """Сбрасывает карточку и ленты публикации.
+
+    Количество публикаций лент сбрасывается только при публикации,
+    снятии с публикации или переносе в другую ленту.
+    """
+    if raw:
+        return
+    scopes = (
+        instance._previous_page_scopes
+        + get_saved_post_page_scopes(instance)
+    )
+    invalidate_post_cards([instance.pk])
+    bump_generations(scopes)
+    if is_publication_changed(instance):
+        invalidate_counts(scopes)
+
+
+@receiver(post_save, sender=Post)
+def touch_post_comments(sender, instance, created, raw, **kwargs):
+    """Возвращает комментарии в ленту изменений при смене видимости поста.
+
+    Комментарии скрытого поста лента выдаёт как удалённые; когда пост
+    снова виден, клиенты должны получить их заново.
+    """
+    if raw or created or not is_publication_changed(instance):
+        return
+    Comment.objects.filter(post_id=instance.pk).update(
+        updated_at=instance.changed_at
+    )
+
+
+@receiver(post_save, sender=Post)
+def process_post_image(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    source = instance.image.name or None
+    if (instance.image_renditions or {}).get('source') != source:
+        tasks.process_post_image.delay(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_image_renditions(sender, instance, **kwargs):
+    images.delete_renditions(
+        instance.image.storage, instance.image_renditions or {}
+    )
+
+
+@receiver(post_delete, sender=Post)
+def log_deleted_post(sender, instance, **kwargs):
+    comment_ids = deleting_posts.comment_ids.pop(instance.pk, [])
+    DeletedObject.objects.bulk_create(
+        [
+            DeletedObject(kind=DeletedObject.COMMENT, object_id=comment_id)
+            for comment_id in comment_ids
+        ] + [DeletedObject(kind=DeletedObject.POST, object_id=instance.pk)]
+    )
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post(sender, instance, **kwargs):
+    invalidate_post_cards([instance.pk])
+    scopes = getattr(instance, '_previous_page_scopes', [])
+    bump_generations(scopes)
+    invalidate_counts(scopes)
+
+
+def invalidate_related_post_cards(**lookup):
+    post_ids = Post.objects.filter(**lookup).values_list('pk', flat=True)
+    invalidate_post_cards(post_ids.iterator())
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def invalidate_category_post_cards(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_related_post_cards(category=instance)
+
+
+def invalidate_category_counts(category, slug):
+    """Сбрасывает количество публикаций лент, где видны посты категории."""
+    usernames = Post.objects.filter(category=category).values_list(
+        'author__username', flat=True
+    ).distinct()
+    invalidate_counts([INDEX_SCOPE, category_scope(slug)] + [
+        profile_scope(username) for username in usernames
+    ])
+
+
+@receiver(pre_save, sender=Category)
+def remember_previous_category(sender, instance, raw, **kwargs):
+    instance._previous_values = None
+    if not (raw or instance._state.adding):
+        instance._previous_values = sender.objects.filter(
+            pk=instance.pk
+        ).values('is_published', 'slug', 'title').first()
+
+
+@receiver(post_save, sender=Category)
+def touch_category_posts(sender, instance, created, raw, **kwargs):
+    """Передаёт изменения категории в ленту изменений и количества лент.
+
+    Снятие категории с публикации скрывает все её посты вместе
+    с комментариями; slug и название выводятся в каждом посте.
+    """
+    previous = instance._previous_values
+    if raw or created or previous is None:
+        return
+    posts = Post.objects.filter(category=instance)
+    if previous['is_published'] != instance.is_published:
+        invalidate_category_counts(instance, previous['slug'])
+        touch_posts(posts)
+        touch_comments(Comment.objects.filter(post__category=instance))
+    elif (previous['slug'], previous['title']) != (
+            instance.slug, instance.title):
+        touch_posts(posts)
+
+
+@receiver(pre_delete, sender=Category)
+def invalidate_deleted_category_counts(sender, instance, **kwargs):
+    """Посты удалённой категории остаются без категории и скрываются."""
+    invalidate_category_counts(instance, instance.slug)
+    touch_posts(Post.objects.filter(category=instance))
+    touch_comments(Comment.objects.filter(post__category=instance))
+
+
+@receiver(pre_save, sender=Location)
+def remember_previous_location(sender, instance, raw, **kwargs):
+    instance._previous_values = None
+    if not (raw or instance._state.adding):
+        instance._previous_values = sender.objects.filter(
+            pk=instance.pk
+        ).values('is_published', 'name').first()
+
+
+@receiver(post_save, sender=Location)
+def touch_location_posts(sender, instance, created, raw, **kwargs):
+    """Название опубликованного местоположения выводится в посте."""
+    previous = instance._previous_values
+    if raw or created or previous is None:
+        return
+    if previous != {'is_published': instance.is_published,
+                    'name': instance.name}:
+        touch_posts(Post.objects.filter(location=instance))
+
+
+@receiver(pre_delete, sender=Location)
+def touch_deleted_location_posts(sender, instance, **kwargs):
+    touch_posts(Post.objects.filter(location=instance))
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def invalidate_location_post_cards(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_related_post_cards(location=instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_pages(sender, instance, raw=False, **kwargs):
+    """Категории и местоположения выводятся на всех страницах лент."""
+    if not raw:
+        bump_generations([GLOBAL_SCOPE])
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_username(
+        sender, instance, raw, update_fields=None, **kwargs):
+    instance._previous_username = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    instance._previous_username = sender.objects.filter(
+        pk=instance.pk
+    ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def touch_author_posts(sender, instance, created, raw, **kwargs):
+    """Username автора выводится в его постах и комментариях."""
+    previous = getattr(instance, '_previous_username', None)
+    if raw or created or previous in (None, instance.username):
+        return
+    touch_posts(Post.objects.filter(author=instance))
+    touch_comments(Comment.objects.filter(author=instance))
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_post_cards(
+        sender, instance, created, raw, update_fields, **kwargs):
+    """На карточке выводится только username автора."""
+    if created or raw:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    invalidate_related_post_cards(author=instance)
+    bump_generations([GLOBAL_SCOPE])
@@ -0,0 +1,15 @@
+from tasks.queue import task
+
+from . import images
+from .cache import set_count
+from .querysets import get_query_set_post
+
+
+@task
+def process_post_image(post_id):
+    images.process_post_image(post_id)
+
+
+@task
+def refresh_post_count(scope, lookups):
+    set_count(scope, get_query_set_post().filter(**lookups).count())
@@ -0,0 +1,63 @@
+from django import template
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.cache import get_post_card, set_post_card
+
+register = template.Library()
+
+POST_IMAGE_SIZES = '(max-width: 40rem) 100vw, 40rem'
+PAGES_ON_EACH_SIDE = 2
+PAGES_ON_ENDS = 1
+
+
+@register.simple_tag
+def post_card(post):
+    """Карточка публикации, закешированная по id и времени изменения."""
+    html = get_post_card(post)
+    if html is None:
+        html = render_to_string('includes/post_card.html', {'post': post})
+        set_post_card(post, html)
+    return mark_safe(html)
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post):
+    """Изображение публикации с адаптивными копиями, если они готовы."""
+    storage = post.image.storage
+    renditions = post.image_renditions or {}
+    srcsets = {}
+    for extension in ('webp', 'jpeg'):
+        srcsets[extension] = ', '.join(
+            f'{storage.url(name)} {width}w'
+            for width, name in renditions.get(extension, ())
+        )
+    src = post.image.url
+    if renditions.get('jpeg'):
+        src = storage.url(renditions['jpeg'][-1][1])
+    return {
+        'post': post,
+        'src': src,
+        'webp_srcset': srcsets['webp'],
+        'jpeg_srcset': srcsets['jpeg'],
+        'sizes': POST_IMAGE_SIZES,
+    }
+
+
+@register.simple_tag
+def page_range(page_obj):
+    """Номера страниц вокруг текущей и по краям, остальные свёрнуты."""
+    return page_obj.paginator.get_elided_page_range(
+        page_obj.number,
+        on_each_side=PAGES_ON_EACH_SIDE,
+        on_ends=PAGES_ON_ENDS
+    )
+
+
+@register.simple_tag(takes_context=True)
+def page_query(context, **kwargs):
+    """Параметры текущего запроса с заменёнными значениями из kwargs."""
+    query = context['request'].GET.copy()
+    for key, value in kwargs.items():
+        query[key] = value
+    return query.urlencode()
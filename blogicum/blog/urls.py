@@ -10,6 +10,11 @@ urlpatterns = [
         views.PostListView.as_view(),
         name='index'
     ),
+    path(
+        'search/',
+        views.PostSearchView.as_view(),
+        name='search'
+    ),
     path(
         'posts/create/',
         views.PostCreateView.as_view(),
@@ -30,6 +35,11 @@ urlpatterns = [
         views.PostDetailView.as_view(),
         name='post_detail'
     ),
+    path(
+        'posts/<int:pk>/comments/',
+        views.PostCommentsView.as_view(),
+        name='comments'
+    ),
     path(
         'posts/<int:pk>/comment/',
         views.CommentCreateView.as_view(),
@@ -1,88 +1,274 @@
-from django.db.models import Count, Prefetch
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect
-from django.utils import timezone
 from django.views.generic import (
     ListView, DetailView, CreateView, DeleteView, UpdateView
 )
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.urls import reverse_lazy, reverse
-from django.db.models import Q
+from django.utils.http import urlencode
 from django.http import JsonResponse, HttpResponse, Http404
+from django.middleware.csrf import get_token
 
+from .cache import (
+    INDEX_SCOPE, category_scope, get_etag, get_page, get_version, page_key,
+    post_scope, profile_scope, set_page
+)
 from .models import Post, User, Comment, Category
 from .forms import PostForm, CommentForm, UserUpdateForm
+from .paginators import CachedCountPaginator, CursorPaginator
+from .querysets import get_query_set_post
+from .search import POST_INDEX, build_match_query
 
 POST_LIMIT = 10
+POST_ORDERING = ('-pub_date', '-id')
+COMMENT_LIMIT = 20
+COMMENT_ORDERING = ('created_at', 'id')
 
 
 class VerificationAuthorBaseClass:
+    """Пускает к редактированию и удалению только автора.
+
+    Объект загружается одним запросом в dispatch и переиспользуется
+    в get_object. Если задан `post_lookup`, объект должен относиться
+    к публикации из URL.
+    """
     model = Post
+    post_lookup = None
 
     def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(self.model, pk=kwargs[self.pk_url_kwarg])
-        if instance.author != request.user:
+        self.object = get_object_or_404(
+            self.get_queryset(), pk=kwargs[self.pk_url_kwarg]
+        )
+        if self.object.author_id != request.user.pk:
             return redirect('blog:post_detail', pk=kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.post_lookup:
+            queryset = queryset.filter(
+                **{self.post_lookup: self.kwargs['post_id']}
+            )
+        return queryset
+
+    def get_object(self, queryset=None):
+        return self.object
+
+
+class PostFeedPaginationMixin:
+    """Пагинация лент публикаций.
 
-def get_query_set_post():
-    query_set_post = Post.objects.select_related(
-        'category',
-        'location',
-        'author',
-    ).filter(
-        is_published=True,
-        pub_date__lt=timezone.now(),
-        category__is_published=True
-    )
-    return query_set_post
+    По умолчанию используется постраничная пагинация Django.
+    Настройка BLOG_CURSOR_PAGINATION включает курсорную пагинацию
+    по (pub_date, id) без COUNT(*) и OFFSET.
+    """
+    cursor_kwarg = 'cursor'
+    paginator_class = CachedCountPaginator
 
+    def get_count_scope(self):
+        """Область кеша количества публикаций и фильтр публичной ленты.
 
-class PostListView(ListView):
+        None — количество считается точно на каждом запросе.
+        """
+        return None
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        count_scope = self.get_count_scope()
+        if count_scope is not None:
+            kwargs['count_scope'], kwargs['count_lookups'] = count_scope
+        return super().get_paginator(
+            queryset, per_page, orphans, allow_empty_first_page, **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.BLOG_CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, POST_ORDERING)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class CacheScopesMixin:
+    """Области кеша, от которых зависит страница.
+
+    Сигналы увеличивают поколения областей при изменении публикаций,
+    комментариев, категорий и т.д.
+    """
+
+    cache_version = None
+
+    def get_cache_scopes(self):
+        return (INDEX_SCOPE,)
+
+    def get_scheduled_posts(self):
+        """Публикации, которые могут появиться на странице по расписанию."""
+        return Post.objects.all()
+
+    def get_cache_version(self):
+        if self.cache_version is None:
+            self.cache_version = get_version(
+                self.get_cache_scopes(), self.get_scheduled_posts()
+            )
+        return self.cache_version
+
+
+class ConditionalGetMixin(CacheScopesMixin):
+    """Отвечает 304 Not Modified, если ETag страницы не изменился."""
+
+    def dispatch(self, request, *args, **kwargs):
+        return condition(etag_func=self.get_etag)(
+            super().dispatch
+        )(request, *args, **kwargs)
+
+    def get_etag(self, request, *args, **kwargs):
+        version, _ = self.get_cache_version()
+        csrf_token = None
+        if request.user.is_authenticated:
+            # get_token заводит токен до рендера, если его ещё нет,
+            # чтобы ETag первого ответа совпадал со следующими.
+            get_token(request)
+            csrf_token = request.META['CSRF_COOKIE']
+        return get_etag(
+            request.get_full_path(), request.user.pk, version, csrf_token
+        )
+
+
+class AnonymousPageCacheMixin(CacheScopesMixin):
+    """Кеширует страницы ленты для анонимных читателей.
+
+    Ключ строится по пути, параметрам из `cache_query_params`
+    (номер страницы и курсор) и поколениям областей кеша
+    из `get_cache_scopes`. Страницы с другими параметрами запроса
+    не кешируются: иначе каждый произвольный параметр заводил бы
+    в кеше новую запись.
+    """
+
+    cache_query_params = ('page', 'cursor')
+
+    def get_cache_path(self, request):
+        """Путь страницы для ключа кеша или None, если её не кешируют."""
+        params = request.GET.lists()
+        if any(name not in self.cache_query_params or len(values) > 1
+               for name, values in params):
+            return None
+        query = urlencode(sorted(request.GET.items()))
+        return f'{request.path}?{query}' if query else request.path
+
+    def dispatch(self, request, *args, **kwargs):
+        path = self.get_cache_path(request)
+        if (request.method != 'GET' or request.user.is_authenticated
+                or path is None):
+            return super().dispatch(request, *args, **kwargs)
+        version, _ = self.get_cache_version()
+        key = page_key(path, version)
+        response = get_page(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, 'render'):
+            response.add_post_render_callback(
+                lambda rendered: self.cache_response(key, rendered)
+            )
+        return response
+
+    def cache_response(self, key, response):
+        _, timeout = self.get_cache_version()
+        if not response.cookies:
+            set_page(key, response, timeout)
+
+
+class PostListView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                   PostFeedPaginationMixin, ListView):
     model = Post
     paginate_by = POST_LIMIT
     template_name = 'blog/index.html'
 
+    def get_count_scope(self):
+        return INDEX_SCOPE, {}
+
     def get_queryset(self):
-        queryset = get_query_set_post().order_by('-pub_date')
-        return queryset.annotate(comment_count=Count('comments'))
+        return get_query_set_post().order_by(*POST_ORDERING)
 
 
-class PostDetailView(DetailView):
+class PostCommentsMixin(ConditionalGetMixin):
+    """Публикация с курсорной пагинацией комментариев по (created_at, id)."""
     model = Post
-    template_name = 'blog/detail.html'
+    cursor_kwarg = 'cursor'
+
+    def get_cache_scopes(self):
+        return (post_scope(self.kwargs['pk']),)
+
+    def get_scheduled_posts(self):
+        return Post.objects.filter(pk=self.kwargs['pk'])
 
     def get_queryset(self):
         return get_query_set_post().filter(pk=self.kwargs['pk'])
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        paginator = CursorPaginator(
+            self.object.comments.select_related('author'),
+            COMMENT_LIMIT,
+            COMMENT_ORDERING
+        )
+        try:
+            context['comments'] = paginator.page(
+                self.request.GET.get(self.cursor_kwarg)
+            )
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return context
+
+
+class PostDetailView(PostCommentsMixin, DetailView):
+    template_name = 'blog/detail.html'
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
         return context
 
 
-class PostCategoryListView(ListView):
+class PostCommentsView(PostCommentsMixin, DetailView):
+    """Фрагмент со страницей комментариев для подгрузки на странице поста."""
+    template_name = 'includes/comment_list.html'
+
+
+class PostCategoryListView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                           PostFeedPaginationMixin, ListView):
     model = Post
     paginate_by = POST_LIMIT
     template_name = 'blog/category.html'
 
+    def get_cache_scopes(self):
+        return (category_scope(self.kwargs['category_slug']),)
+
+    def get_scheduled_posts(self):
+        return Post.objects.filter(
+            category__slug=self.kwargs['category_slug']
+        )
+
+    def get_count_scope(self):
+        slug = self.kwargs['category_slug']
+        return category_scope(slug), {'category__slug': slug}
+
     def get_queryset(self):
         self.category = get_object_or_404(
-            Category.objects.filter(
-                slug=self.kwargs['category_slug'],
-                is_published=True
-            ).prefetch_related(
-                Prefetch(
-                    'post_set',
-                    get_query_set_post().annotate(
-                        comment_count=Count('comments')
-                    ).order_by('-pub_date'),
-                    'post_list'
-                )
-            )
+            Category,
+            slug=self.kwargs['category_slug'],
+            is_published=True
         )
-        return self.category.post_list
+        return get_query_set_post().filter(
+            category=self.category
+        ).order_by(*POST_ORDERING)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -90,39 +276,68 @@ class PostCategoryListView(ListView):
         return context
 
 
-class ProfileListView(ListView):
+class PostSearchView(ListView):
+    """Поиск по заголовкам и текстам видимых публикаций."""
+    model = Post
+    paginate_by = POST_LIMIT
+    template_name = 'blog/search.html'
+    query_kwarg = 'q'
+
+    def get_queryset(self):
+        self.query = self.request.GET.get(self.query_kwarg, '').strip()
+        self.match = build_match_query(self.query)
+        if not self.match:
+            return Post.objects.none()
+        return POST_INDEX.rank(get_query_set_post(), self.match)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        if self.match:
+            posts = list(context['page_obj'])
+            snippets = POST_INDEX.snippets(
+                self.match, [post.pk for post in posts]
+            )
+            for post in posts:
+                post.snippet = snippets.get(post.pk, '')
+        return context
+
+
+class ProfileListView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                      PostFeedPaginationMixin, ListView):
     model = Post
     template_name = 'blog/profile.html'
-    ordering = 'pub_date'
     paginate_by = POST_LIMIT
     profile = None
 
+    def get_cache_scopes(self):
+        return (profile_scope(self.kwargs['username']),)
+
+    def get_scheduled_posts(self):
+        return Post.objects.filter(author__username=self.kwargs['username'])
+
+    def get_count_scope(self):
+        if self.request.user == self.profile:
+            return None
+        username = self.kwargs['username']
+        return profile_scope(username), {'author__username': username}
+
     def get_queryset(self):
-        queryset = Post.objects.filter(
-            author__username=self.kwargs['username']
-        )
-        if self.request.user.username != self.kwargs['username']:
-            queryset = Post.objects.filter(
-                Q(author__username=self.kwargs['username'])
-                & Q(is_published=True)
-                & Q(pub_date__lt=timezone.now())
-                & Q(category__is_published=True)
-            )
         self.profile = get_object_or_404(
-            User.objects.filter(
-                username=self.kwargs['username']
-            ).prefetch_related(
-                Prefetch(
-                    'post_set',
-                    queryset.annotate(
-                        comment_count=Count('comments')
-                    ).order_by('-pub_date'),
-                    'post_list'
-                )
-            )
+            User,
+            username=self.kwargs['username']
         )
-
-        return self.profile.post_list
+        if self.request.user == self.profile:
+            queryset = Post.objects.select_related(
+                'category',
+                'location',
+                'author',
+            )
+        else:
+            queryset = get_query_set_post()
+        return queryset.filter(
+            author=self.profile
+        ).order_by(*POST_ORDERING)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -172,6 +387,7 @@ class PostDeleteView(VerificationAuthorBaseClass, DeleteView):
         return context
 
 
+@method_decorator(transaction.atomic, name='form_valid')
 class CommentCreateView(LoginRequiredMixin, CreateView):
     post_obj = None
     model = Comment
@@ -192,6 +408,7 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
 
 class CommentUpdateView(VerificationAuthorBaseClass, UpdateView):
     model = Comment
+    post_lookup = 'post_id'
     form_class = CommentForm
     template_name = 'blog/comment.html'
 
@@ -201,8 +418,10 @@ class CommentUpdateView(VerificationAuthorBaseClass, UpdateView):
         )
 
 
+@method_decorator(transaction.atomic, name='delete')
 class CommentDeleteView(VerificationAuthorBaseClass, DeleteView):
     model = Comment
+    post_lookup = 'post_id'
     template_name = 'blog/comment.html'
 
     def get_success_url(self):
@@ -0,0 +1,19 @@
+import random
+
+from django.core.cache.backends import filebased
+
+CULL_CHECK_EVERY = 100
+
+
+class FileBasedCache(filebased.FileBasedCache):
+    """Файловый кеш, общий для процессов сайта и обработчика задач.
+
+    Стандартный бэкенд перед каждой записью перечисляет все файлы
+    каталога, чтобы проверить MAX_ENTRIES, и с тысячами записей это
+    занимает миллисекунды. Здесь проверка делается в среднем раз
+    в CULL_CHECK_EVERY записей.
+    """
+
+    def _cull(self):
+        if random.randrange(CULL_CHECK_EVERY) == 0:
+            super()._cull()
@@ -1,3 +1,4 @@
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -21,6 +22,9 @@ ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
 INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
+    'tasks.apps.TasksConfig',
+    'api.apps.ApiConfig',
+    'monitoring.apps.MonitoringConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -32,6 +36,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.ServerTimingMiddleware',
+    'monitoring.middleware.MetricsMiddleware',
+    'monitoring.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,6 +81,20 @@ DATABASES = {
     }
 }
 
+# Кеш должен быть общим для всех процессов сайта и обработчика задач:
+# иначе сброс кеша при изменении данных и фоновый пересчёт количества
+# публикаций видны только одному процессу. В продакшене вместо файлов
+# лучше использовать Memcached или Redis.
+CACHES = {
+    'default': {
+        'BACKEND': 'blogicum.cache_backends.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'blogicum-cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -123,10 +144,63 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = 'tasks.mail.QueuedEmailBackend'
+
+TASKS_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
 LOGIN_REDIRECT_URL = 'blog:index'
+
+BLOG_CURSOR_PAGINATION = False
+
+TASKS_ALWAYS_EAGER = False
+
+MONITORING_SERVER_TIMING = False
+
+MONITORING_SAMPLE_RATE = 0.1
+
+MONITORING_METRICS = True
+
+MONITORING_METRICS_TOKEN = None
+
+MONITORING_SLOW_QUERY_MS = 200
+
+MONITORING_SLOW_QUERY_LOG = BASE_DIR / 'slowqueries.log'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {
+            'format': '%(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': MONITORING_SLOW_QUERY_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'monitoring': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'monitoring.slowqueries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
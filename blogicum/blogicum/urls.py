@@ -21,5 +21,7 @@ urlpatterns = [
     ),
     path('auth/', include('django.contrib.auth.urls')),
     path('pages/', include('pages.urls', namespace='pages')),
+    path('api/', include('api.urls', namespace='api')),
+    path('', include('monitoring.urls', namespace='monitoring')),
     path('admin/', admin.site.urls),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from monitoring.slowqueries import aggregate, read_records
+
+SORT_KEYS = {
+    'total': 'total_ms',
+    'count': 'count',
+    'max': 'max_ms',
+    'mean': 'mean_ms',
+}
+
+
+def most_common(counts):
+    return ', '.join(
+        f'{name} ({count})' for name, count in counts.most_common()
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка лога медленных запросов: запросы с одинаковым '
+        'нормализованным SQL объединяются по отпечатку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            default=settings.MONITORING_SLOW_QUERY_LOG,
+            help='Файл лога; ротированные копии читаются тоже.'
+        )
+        parser.add_argument(
+            '--sort',
+            choices=tuple(SORT_KEYS),
+            default='total',
+            help='Порядок: по общему, максимальному, среднему времени '
+                 'или количеству.'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Сколько запросов показать.'
+        )
+        parser.add_argument(
+            '--plan',
+            action='store_true',
+            help='Показать план последнего выполнения.'
+        )
+
+    def handle(self, *args, **options):
+        groups = aggregate(read_records(options['file']))
+        if not groups:
+            self.stdout.write('Медленных запросов нет.')
+            return
+        groups.sort(key=lambda group: group[SORT_KEYS[options['sort']]],
+                    reverse=True)
+        for group in groups[:options['limit']]:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{group["fingerprint"]}  запросов: {group["count"]}  '
+                f'всего: {group["total_ms"]:.1f} мс  '
+                f'среднее: {group["mean_ms"]:.1f} мс  '
+                f'максимум: {group["max_ms"]:.1f} мс'
+            ))
+            self.stdout.write(f'  view: {most_common(group["views"])}')
+            self.stdout.write(f'  вызов: {most_common(group["origins"])}')
+            self.stdout.write(f'  SQL: {group["sql"]}')
+            if options['plan'] and group['plan']:
+                self.stdout.write('  план:')
+                for line in group['plan']:
+                    self.stdout.write(f'    {line}')
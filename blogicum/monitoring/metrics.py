@@ -0,0 +1,86 @@
+import os
+
+from django.db.models import Count
+from prometheus_client import (REGISTRY, CollectorRegistry, Counter,
+                               Histogram, generate_latest, multiprocess)
+from prometheus_client.core import GaugeMetricFamily
+
+from tasks.models import Task
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+UNRESOLVED = 'unresolved'
+
+REQUEST_LATENCY = Histogram(
+    'blogicum_request_duration_seconds',
+    'Время обработки запроса по имени URL.',
+    ['view', 'method']
+)
+REQUEST_QUERIES = Histogram(
+    'blogicum_request_queries',
+    'Количество SQL-запросов за запрос по имени URL.',
+    ['view'],
+    buckets=QUERY_BUCKETS
+)
+CACHE_REQUESTS = Counter(
+    'blogicum_cache_requests',
+    'Обращения к кешу страниц, карточек и количеств публикаций.',
+    ['cache', 'result']
+)
+IMAGE_PROCESSING = Histogram(
+    'blogicum_image_processing_seconds',
+    'Время создания копий изображения публикации.'
+)
+
+
+class TaskQueueCollector:
+    """Размер очереди фоновых задач, считается при каждом опросе."""
+
+    name = 'blogicum_task_queue_depth'
+    documentation = 'Задачи в очереди по функции и статусу.'
+
+    def family(self):
+        return GaugeMetricFamily(
+            self.name, self.documentation, labels=['task', 'status']
+        )
+
+    def describe(self):
+        return [self.family()]
+
+    def collect(self):
+        gauge = self.family()
+        rows = Task.objects.values('name', 'status').annotate(
+            total=Count('pk')).order_by()
+        for row in rows:
+            gauge.add_metric([row['name'], row['status']], row['total'])
+        yield gauge
+
+
+TASK_QUEUE = TaskQueueCollector()
+REGISTRY.register(TASK_QUEUE)
+
+
+def observe_request(view, method, duration, queries):
+    view = view or UNRESOLVED
+    REQUEST_LATENCY.labels(
+        view, method if method in METHODS else 'other'
+    ).observe(duration)
+    REQUEST_QUERIES.labels(view).observe(queries)
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def render_metrics():
+    """Метрики в текстовом формате Prometheus.
+
+    Если задан PROMETHEUS_MULTIPROC_DIR, значения собираются
+    из файлов всех процессов.
+    """
+    if not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(TASK_QUEUE)
+    return generate_latest(registry)
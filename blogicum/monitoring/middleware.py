@@ -0,0 +1,162 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics
+from .slowqueries import SlowQueryRecorder
+
+logger = logging.getLogger('monitoring.requests')
+
+
+@contextmanager
+def wrap_queries(wrapper):
+    """Подключает `wrapper` ко всем базам данных текущего потока."""
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(wrapper))
+        yield
+
+
+def get_view_name(request):
+    match = request.resolver_match
+    return match.view_name if match else None
+
+
+class RequestTimer:
+    """Время SQL, отрисовки шаблона и всего запроса.
+
+    Время запросов к базе, выполненных при отрисовке шаблона
+    (ленивые QuerySet), входит в `db`, а не в `tpl`.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+        self.total = 0.0
+        self._render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - start
+            self.queries += 1
+
+    def render_started(self):
+        self._render_started = (time.perf_counter(), self.db)
+
+    def render_finished(self, response):
+        start, db = self._render_started
+        self.template += time.perf_counter() - start - (self.db - db)
+
+    def metrics(self):
+        """Длительности в миллисекундах."""
+        return {
+            'db': self.db * 1000,
+            'tpl': self.template * 1000,
+            'app': (self.total - self.db - self.template) * 1000,
+            'total': self.total * 1000,
+        }
+
+    def header(self):
+        metrics = [
+            f'{name};dur={value:.1f}' for name, value in self.metrics().items()
+        ]
+        return ', '.join(metrics + [f'queries;desc={self.queries}'])
+
+
+class ServerTimingMiddleware:
+    """Заголовок Server-Timing и строка лога в JSON на каждый запрос.
+
+    Включается настройкой MONITORING_SERVER_TIMING, измеряется доля
+    запросов MONITORING_SAMPLE_RATE. Должен стоять первым в MIDDLEWARE,
+    чтобы учитывать время остальных middleware. Запросы потоковых
+    ответов, выполненные после выхода из view, не учитываются.
+    """
+
+    def __init__(self, get_response):
+        if not settings.MONITORING_SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.MONITORING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        timer = request.server_timing = RequestTimer()
+        start = time.perf_counter()
+        with wrap_queries(timer):
+            response = self.get_response(request)
+        timer.total = time.perf_counter() - start
+        response['Server-Timing'] = timer.header()
+        self.log(request, response, timer)
+        return response
+
+    def process_template_response(self, request, response):
+        timer = getattr(request, 'server_timing', None)
+        if timer is not None:
+            timer.render_started()
+            response.add_post_render_callback(timer.render_finished)
+        return response
+
+    def log(self, request, response, timer):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': get_view_name(request),
+            'status': response.status_code,
+            'queries': timer.queries,
+        }
+        record.update(
+            (f'{name}_ms', round(value, 1))
+            for name, value in timer.metrics().items()
+        )
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+
+class MetricsMiddleware:
+    """Время ответа и число SQL-запросов по именам URL для /metrics.
+
+    Включается настройкой MONITORING_METRICS.
+    """
+
+    def __init__(self, get_response):
+        if not settings.MONITORING_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = RequestTimer()
+        start = time.perf_counter()
+        with wrap_queries(timer):
+            response = self.get_response(request)
+        metrics.observe_request(
+            get_view_name(request), request.method,
+            time.perf_counter() - start, timer.queries
+        )
+        return response
+
+
+class SlowQueryMiddleware:
+    """Пишет в лог запросы к базе дольше MONITORING_SLOW_QUERY_MS.
+
+    Порог None отключает запись.
+    """
+
+    def __init__(self, get_response):
+        if settings.MONITORING_SLOW_QUERY_MS is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold_ms = settings.MONITORING_SLOW_QUERY_MS
+
+    def __call__(self, request):
+        with wrap_queries(SlowQueryRecorder(request, self.threshold_ms)):
+            return self.get_response(request)
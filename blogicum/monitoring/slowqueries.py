@@ -0,0 +1,171 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.template.base import Template
+from django.utils import timezone
+
+logger = logging.getLogger('monitoring.slowqueries')
+
+MONITORING_DIR = os.path.dirname(os.path.abspath(__file__))
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """SQL без значений: строки и числа заменены на ?, списки IN — на (...).
+
+    Запросы, отличающиеся только параметрами, получают одинаковый текст.
+    """
+    sql = sql.replace('%s', '?')
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = PLACEHOLDER_LIST_RE.sub('(...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()[:16]
+
+
+def get_origin():
+    """Место вызова запроса.
+
+    «файл:строка функция» ближайшего вызова из кода проекта или имя
+    шаблона, если QuerySet вычислен при отрисовке.
+    """
+    base_dir = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (filename.startswith(base_dir)
+                and not filename.startswith(MONITORING_DIR)
+                and 'site-packages' not in filename):
+            path = os.path.relpath(filename, base_dir)
+            return f'{path}:{frame.f_lineno} {frame.f_code.co_name}'
+        template = frame.f_locals.get('self')
+        if frame.f_code.co_name == 'render' and isinstance(template, Template):
+            return f'template {template.origin.template_name}'
+        frame = frame.f_back
+    return None
+
+
+def explain(connection, sql, params):
+    """План SELECT-запроса или текст ошибки, если получить его не удалось."""
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    prefix = (
+        'EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite' else 'EXPLAIN'
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            return [
+                ' '.join(str(value) for value in row)
+                for row in cursor.fetchall()
+            ]
+    except DatabaseError as error:
+        return [f'Ошибка: {error}']
+
+
+class SlowQueryRecorder:
+    """Обёртка execute, записывающая запросы дольше порога.
+
+    Для каждого медленного запроса в лог monitoring.slowqueries пишется
+    строка JSON: нормализованный SQL, отпечаток, view, место вызова
+    и план запроса.
+    """
+
+    def __init__(self, request, threshold_ms):
+        self.request = request
+        self.threshold = threshold_ms / 1000
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - start
+        if duration >= self.threshold:
+            self.record(sql, None if many else params, duration, context)
+        return result
+
+    def record(self, sql, params, duration, context):
+        normalized = normalize_sql(sql)
+        match = self.request.resolver_match
+        self.explaining = True
+        try:
+            plan = explain(context['connection'], sql, params)
+        finally:
+            self.explaining = False
+        logger.warning(json.dumps({
+            'time': timezone.now().isoformat(),
+            'duration_ms': round(duration * 1000, 2),
+            'fingerprint': fingerprint(normalized),
+            'sql': normalized,
+            'view': match.view_name if match else None,
+            'path': self.request.path,
+            'origin': get_origin(),
+            'plan': plan,
+        }, ensure_ascii=False))
+
+
+def backup_number(filename):
+    suffix = filename.rsplit('.', 1)[1]
+    return int(suffix) if suffix.isdigit() else None
+
+
+def get_log_files(path):
+    """Файл лога и его ротированные копии, от старых к новым."""
+    path = str(path)
+    backups = [
+        filename for filename in glob.glob(f'{glob.escape(path)}.*')
+        if backup_number(filename) is not None
+    ]
+    backups.sort(key=backup_number, reverse=True)
+    return backups + ([path] if os.path.exists(path) else [])
+
+
+def read_records(path):
+    for filename in get_log_files(path):
+        with open(filename, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def aggregate(records):
+    """Сводка медленных запросов по отпечатку нормализованного SQL."""
+    groups = {}
+    for record in records:
+        group = groups.setdefault(record['fingerprint'], {
+            'fingerprint': record['fingerprint'],
+            'sql': record['sql'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'views': Counter(),
+            'origins': Counter(),
+        })
+        group['count'] += 1
+        group['total_ms'] += record['duration_ms']
+        group['max_ms'] = max(group['max_ms'], record['duration_ms'])
+        group['views'][record['view']] += 1
+        group['origins'][record['origin']] += 1
+        group['plan'] = record['plan']
+    for group in groups.values():
+        group['mean_ms'] = group['total_ms'] / group['count']
+    return list(groups.values())
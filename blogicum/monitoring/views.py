@@ -0,0 +1,27 @@
+import hmac
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from .metrics import render_metrics
+
+
+def has_metrics_access(request):
+    """Доступ для персонала или по токену из MONITORING_METRICS_TOKEN."""
+    if request.user.is_staff:
+        return True
+    token = settings.MONITORING_METRICS_TOKEN
+    scheme, _, credentials = request.headers.get(
+        'Authorization', ''
+    ).partition(' ')
+    return bool(token) and scheme.lower() == 'bearer' and (
+        hmac.compare_digest(credentials.encode(), token.encode())
+    )
+
+
+def export_metrics(request):
+    if not has_metrics_access(request):
+        raise PermissionDenied
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,27 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'name',
+        'status',
+        'attempts',
+        'run_after',
+        'created_at',
+    )
+    list_filter = (
+        'status',
+        'name',
+    )
+    readonly_fields = (
+        'locked_at',
+        'last_error',
+        'created_at',
+    )
+    ordering = (
+        '-id',
+    )
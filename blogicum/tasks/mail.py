@@ -0,0 +1,69 @@
+import base64
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .queue import task
+
+
+def serialize_message(message):
+    attachments = []
+    for attachment in message.attachments:
+        if not isinstance(attachment, tuple):
+            raise ValueError('Вложения MIMEBase не поддерживаются очередью.')
+        filename, content, mimetype = attachment
+        if isinstance(content, str):
+            content = content.encode()
+        attachments.append(
+            [filename, base64.b64encode(content).decode(), mimetype]
+        )
+    return {
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': message.extra_headers,
+        'alternatives': getattr(message, 'alternatives', []),
+        'attachments': attachments,
+        'content_subtype': message.content_subtype,
+    }
+
+
+def deserialize_message(data):
+    message = EmailMultiAlternatives(
+        subject=data['subject'],
+        body=data['body'],
+        from_email=data['from_email'],
+        to=data['to'],
+        cc=data['cc'],
+        bcc=data['bcc'],
+        reply_to=data['reply_to'],
+        headers=data['headers'],
+        alternatives=[tuple(item) for item in data['alternatives']],
+    )
+    message.content_subtype = data['content_subtype']
+    for filename, content, mimetype in data['attachments']:
+        message.attach(filename, base64.b64decode(content), mimetype)
+    return message
+
+
+@task(max_attempts=5)
+def send_email(data):
+    connection = get_connection(settings.TASKS_EMAIL_BACKEND)
+    connection.send_messages([deserialize_message(data)])
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Ставит письма в очередь фоновых задач вместо отправки.
+
+    Письма отправляет обработчик через TASKS_EMAIL_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            send_email.delay(serialize_message(message))
+        return len(email_messages)
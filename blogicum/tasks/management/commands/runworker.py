@@ -0,0 +1,58 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks.queue import work
+
+
+def work_in_process(once, sleep):
+    connections.close_all()
+    work(once=once, sleep=sleep)
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчики фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Количество процессов-обработчиков.'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить готовые задачи и завершиться.'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Пауза между опросами пустой очереди, секунд.'
+        )
+
+    def handle(self, *args, **options):
+        once, sleep = options['once'], options['sleep']
+        if options['processes'] <= 1:
+            processed = work(once=once, sleep=sleep)
+            self.stdout.write(
+                self.style.SUCCESS(f'Выполнено задач: {processed}')
+            )
+            return
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(
+                target=work_in_process, args=(once, sleep), daemon=True
+            )
+            for _ in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
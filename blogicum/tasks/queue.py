@@ -0,0 +1,136 @@
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+RETRY_DELAY = 30
+LOCK_TIMEOUT = 60 * 10
+CLAIM_BATCH = 10
+MAX_BACKOFF = 30
+
+logger = logging.getLogger(__name__)
+
+
+def task(func=None, *, max_attempts=3):
+    """Регистрирует функцию как фоновую задачу.
+
+    Вызов `func.delay(*args, **kwargs)` ставит задачу в очередь;
+    аргументы должны сериализоваться в JSON. При TASKS_ALWAYS_EAGER
+    задача выполняется сразу, в текущем процессе.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        def delay(*args, **kwargs):
+            return enqueue(name, args, kwargs, max_attempts=max_attempts)
+
+        func.delay = delay
+        return func
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+def enqueue(name, args=(), kwargs=None, max_attempts=3):
+    kwargs = kwargs or {}
+    if settings.TASKS_ALWAYS_EAGER:
+        import_string(name)(*args, **kwargs)
+        return None
+    return Task.objects.create(
+        name=name,
+        payload={'args': list(args), 'kwargs': kwargs},
+        max_attempts=max_attempts
+    )
+
+
+def requeue_stale():
+    """Возвращает в очередь задачи упавших обработчиков."""
+    return Task.objects.filter(
+        status=Task.RUNNING,
+        locked_at__lt=timezone.now() - timedelta(seconds=LOCK_TIMEOUT)
+    ).update(status=Task.PENDING, locked_at=None)
+
+
+def claim():
+    """Атомарно забирает одну готовую задачу, возвращает её id или None."""
+    now = timezone.now()
+    task_ids = Task.objects.filter(
+        status=Task.PENDING,
+        run_after__lte=now
+    ).values_list('pk', flat=True)[:CLAIM_BATCH]
+    for task_id in task_ids:
+        claimed = Task.objects.filter(
+            pk=task_id,
+            status=Task.PENDING
+        ).update(
+            status=Task.RUNNING,
+            locked_at=now,
+            attempts=F('attempts') + 1
+        )
+        if claimed:
+            return task_id
+    return None
+
+
+def run(task_id):
+    """Выполняет задачу; при ошибке откладывает повтор или помечает сбой."""
+    task = Task.objects.get(pk=task_id)
+    try:
+        import_string(task.name)(
+            *task.payload.get('args', ()), **task.payload.get('kwargs', {})
+        )
+    except Exception:
+        task.last_error = traceback.format_exc()
+        task.locked_at = None
+        if task.attempts >= task.max_attempts:
+            task.status = Task.FAILED
+        else:
+            task.status = Task.PENDING
+            task.run_after = timezone.now() + timedelta(
+                seconds=RETRY_DELAY * 2 ** (task.attempts - 1)
+            )
+        task.save(update_fields=(
+            'status', 'run_after', 'locked_at', 'last_error'
+        ))
+        return False
+    task.delete()
+    return True
+
+
+def work(once=False, sleep=1.0):
+    """Цикл обработчика: берёт задачи, пока они есть.
+
+    При `once=True` завершается, когда очередь опустела. Ошибка базы
+    при взятии задачи (например, «database is locked» в SQLite при
+    нескольких обработчиках) не останавливает цикл: соединение
+    закрывается, и попытка повторяется с растущей паузой.
+    """
+    processed = 0
+    failures = 0
+    while True:
+        try:
+            requeue_stale()
+            task_id = claim()
+        except DatabaseError as error:
+            failures += 1
+            logger.warning('Не удалось взять задачу: %s', error)
+            connection.close()
+            time.sleep(min(sleep * 2 ** (failures - 1), MAX_BACKOFF))
+            continue
+        failures = 0
+        if task_id is not None:
+            run(task_id)
+            processed += 1
+            continue
+        if once:
+            return processed
+        time.sleep(sleep)
@@ -1,3 +1,4 @@
+import functools
 import os
 import re
 import time
@@ -81,6 +82,14 @@ def mixer():
     return _mixer
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def user(mixer):
     User = get_user_model()
@@ -113,6 +122,86 @@ def another_user_client(another_user):
     return client
 
 
+class QueryBudget:
+    """Считает SQL-запросы каждого запроса к именованным URL.
+
+    Тест падает, если запрос к URL из `budgets` выполнил больше
+    запросов к базе, чем разрешено.
+    """
+
+    def __init__(self, budgets: Optional[dict] = None):
+        self.budgets = dict(budgets or {})
+        self.counts: List[Tuple[Optional[str], int]] = []
+        self._url_name: Optional[str] = None
+        self._queries = 0
+        self._wrapper = None
+
+    def set(self, url_name: str, max_queries: int) -> None:
+        self.budgets[url_name] = max_queries
+
+    def _count_query(self, execute, sql, params, many, context):
+        self._queries += 1
+        return execute(sql, params, many, context)
+
+    def _request_started(self, environ, **kwargs):
+        from django.urls import Resolver404, resolve
+        try:
+            self._url_name = resolve(environ['PATH_INFO']).view_name
+        except Resolver404:
+            self._url_name = None
+        self._queries = 0
+
+    def _request_finished(self, **kwargs):
+        self.counts.append((self._url_name, self._queries))
+
+    def violations(self) -> List[str]:
+        return [
+            f'{url_name}: {count} SQL-запросов при бюджете '
+            f'{self.budgets[url_name]}'
+            for url_name, count in self.counts
+            if url_name in self.budgets and count > self.budgets[url_name]
+        ]
+
+    def __enter__(self):
+        from django.core.signals import request_finished, request_started
+        from django.db import connection
+        request_started.connect(self._request_started)
+        request_finished.connect(self._request_finished)
+        self._wrapper = connection.execute_wrapper(self._count_query)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        from django.core.signals import request_finished, request_started
+        self._wrapper.__exit__(exc_type, exc_value, traceback)
+        request_started.disconnect(self._request_started)
+        request_finished.disconnect(self._request_finished)
+        violations = self.violations()
+        if exc_type is None and violations:
+            pytest.fail(
+                'Превышен бюджет SQL-запросов, проверьте, нет ли N+1:\n'
+                + '\n'.join(violations)
+            )
+
+
+def max_queries(url_name: str, limit: int):
+    """Декоратор теста: запросы к `url_name` укладываются в `limit`."""
+    def decorator(test):
+        @functools.wraps(test)
+        def wrapper(*args, **kwargs):
+            with QueryBudget({url_name: limit}):
+                return test(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@pytest.fixture
+def query_budget():
+    """Бюджет SQL-запросов на весь тест, URL задаются через `set`."""
+    with QueryBudget() as budget:
+        yield budget
+
+
 def get_post_list_context_key(
         user_client, page_url, page_load_err_msg, key_missing_msg):
     try:
@@ -333,8 +422,7 @@ def cleanup(request):
 
     for root, dirs, files in os.walk(image_dir):
         for filename in files:
-            if (filename.endswith('.jpg') or filename.endswith(
-                    '.gif') or filename.endswith('.png')):
+            if filename.endswith(('.jpg', '.jpeg', '.gif', '.png', '.webp')):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
                     os.remove(file_path)
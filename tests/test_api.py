@@ -0,0 +1,137 @@
+import json
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def api_posts(user, published_category, published_location):
+    pub_date = timezone.now() - timedelta(days=1)
+    Post.objects.bulk_create(
+        Post(title=f'Пост {i}', text='Текст', author=user,
+             category=published_category, location=published_location,
+             pub_date=pub_date - timedelta(hours=i // 3))
+        for i in range(25)
+    )
+    return list(Post.objects.order_by('pk'))
+
+
+def test_posts_follow_site_visibility(
+        client, api_posts, posts_with_unpublished_category, future_posts):
+    response = client.get('/api/v1/posts/')
+    assert response.status_code == HTTPStatus.OK
+    ids = {item['id'] for item in response.json()['results']}
+    hidden = {post.id for post in posts_with_unpublished_category}
+    hidden |= {post.id for post in future_posts}
+    assert not ids & hidden, (
+        'Убедитесь, что API отдаёт только посты, видимые на сайте.'
+    )
+
+
+def test_posts_cursor_walk(client, api_posts):
+    expected = [
+        post.pk for post in sorted(
+            api_posts, key=lambda p: (p.pub_date, p.pk), reverse=True)
+    ]
+    seen, url = [], '/api/v1/posts/'
+    while url:
+        with CaptureQueriesContext(connection) as ctx:
+            data = client.get(url).json()
+        assert not any('COUNT(' in q['sql'] for q in ctx.captured_queries)
+        assert len(ctx.captured_queries) <= 3, (
+            'Убедитесь, что страница API загружается '
+            'без запросов на каждый пост.'
+        )
+        seen.extend(item['id'] for item in data['results'])
+        url = data['next']
+    assert seen == expected, (
+        'Убедитесь, что курсорная пагинация API выдаёт все посты '
+        'без пропусков и повторов.'
+    )
+
+
+def test_post_fields(client, mixer, api_posts):
+    post = api_posts[0]
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    data = client.get(f'/api/v1/posts/{post.id}/').json()
+    assert data['author'] == post.author.username
+    assert data['category']['slug'] == post.category.slug
+    assert data['location'] == post.location.name
+    assert data['comment_count'] == 2
+
+    data = client.get(f'/api/v1/posts/{post.id}/?fields=id,title').json()
+    assert set(data) == {'id', 'title'}, (
+        'Убедитесь, что параметр fields оставляет только запрошенные поля.'
+    )
+
+
+def test_post_comments(client, mixer, api_posts):
+    post = api_posts[0]
+    comments = mixer.cycle(3).blend('blog.Comment', post=post)
+    data = client.get(f'/api/v1/posts/{post.id}/comments/').json()
+    assert [item['id'] for item in data['results']] == [
+        comment.id for comment in comments]
+
+
+@pytest.mark.parametrize('pk', ('abc', '0'))
+def test_post_detail_bad_pk_is_not_found(client, pk):
+    response = client.get(f'/api/v1/posts/{pk}/')
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что для некорректного id поста API отвечает 404.'
+    )
+
+
+def test_categories(client, published_category, mixer):
+    hidden = mixer.blend('blog.Category', is_published=False)
+    slugs = [item['slug'] for item in client.get('/api/v1/categories/').json()]
+    assert published_category.slug in slugs
+    assert hidden.slug not in slugs
+
+
+def test_post_etag(client, mixer, api_posts):
+    post = api_posts[0]
+    url = f'/api/v1/posts/{post.id}/'
+    response = client.get(url)
+    etag = response['ETag']
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что API отвечает 304 Not Modified '
+        'на запрос с актуальным ETag.'
+    )
+    mixer.blend('blog.Comment', post=post)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+def test_export_streams_visible_posts(
+        client, api_posts, posts_with_unpublished_category):
+    response = client.get('/api/v1/export/posts.ndjson')
+    assert response.status_code == HTTPStatus.OK
+    assert response.streaming, (
+        'Убедитесь, что выгрузка постов отдаётся потоковым ответом.'
+    )
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    items = [json.loads(line) for line in lines]
+    assert [item['id'] for item in items] == [post.id for post in api_posts]
+    assert items[0]['author'] == api_posts[0].author.username
+    assert 'comment_count' in items[0]
+
+
+def test_export_command(api_posts):
+    out = StringIO()
+    call_command('export_posts', chunk_size=7, stdout=out)
+    ids = [json.loads(line)['id'] for line in out.getvalue().splitlines()]
+    assert ids == [post.id for post in api_posts]
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _get_object_queries(client, url, table):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    queries = [
+        q['sql'] for q in ctx.captured_queries
+        if q['sql'].startswith(f'SELECT "{table}"')]
+    return response, queries
+
+
+@pytest.mark.parametrize(
+    'url', ('/posts/{post}/edit/', '/posts/{post}/delete/'))
+def test_post_author_views_fetch_object_once(
+        user_client, post_with_published_location, url):
+    post = post_with_published_location
+    response, queries = _get_object_queries(
+        user_client, url.format(post=post.id), 'blog_post')
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == 1, (
+        'Убедитесь, что страницы редактирования и удаления публикации '
+        'загружают публикацию одним запросом.'
+    )
+
+
+@pytest.mark.parametrize(
+    'url', (
+        '/posts/{post}/edit_comment/{comment}/',
+        '/posts/{post}/delete_comment/{comment}/',
+    ))
+def test_comment_author_views_fetch_object_once(
+        mixer, user, user_client, post_with_published_location, url):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    response, queries = _get_object_queries(
+        user_client, url.format(post=post.id, comment=comment.id),
+        'blog_comment')
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == 1, (
+        'Убедитесь, что страницы редактирования и удаления комментария '
+        'загружают комментарий одним запросом.'
+    )
+
+
+def test_comment_must_belong_to_post_from_url(
+        mixer, user, user_client, post_with_published_location):
+    comment = mixer.blend(
+        'blog.Comment', post=post_with_published_location, author=user)
+    other_post = mixer.blend('blog.Post', author=user)
+    for url in (
+        f'/posts/{other_post.id}/edit_comment/{comment.id}/',
+        f'/posts/{other_post.id}/delete_comment/{comment.id}/',
+    ):
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Убедитесь, что комментарий нельзя открыть по адресу '
+            'чужой публикации.'
+        )
+
+
+def test_non_author_is_redirected(
+        another_user_client, post_with_published_location):
+    post = post_with_published_location
+    response = another_user_client.get(f'/posts/{post.id}/edit/')
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.url == f'/posts/{post.id}/'
@@ -0,0 +1,205 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.cache import get_version, post_card_key
+from blog.models import Post
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_post_card_is_cached_and_invalidated(
+        mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    unlogged_client.get('/')
+    assert cache.get(post_card_key(post.pk)) is not None, (
+        'Убедитесь, что карточка публикации кешируется.'
+    )
+
+    category = post.category
+    category.title = 'Новое название категории'
+    category.save()
+    assert cache.get(post_card_key(post.pk)) is None, (
+        'Убедитесь, что при изменении категории '
+        'кеш карточек её публикаций сбрасывается.'
+    )
+    assert category.title in unlogged_client.get('/').content.decode()
+
+    mixer.blend('blog.Comment', post=post)
+    assert cache.get(post_card_key(post.pk)) is None, (
+        'Убедитесь, что при добавлении комментария '
+        'кеш карточки публикации сбрасывается.'
+    )
+    assert 'Комментарии (1)' in unlogged_client.get('/').content.decode()
+
+    post.title = 'Новый заголовок'
+    post.save()
+    assert post.title in unlogged_client.get('/').content.decode()
+
+
+def test_anonymous_feed_page_is_cached(
+        mixer, unlogged_client, user_client, post_with_published_location):
+    post = post_with_published_location
+    unlogged_client.get('/')
+    with CaptureQueriesContext(connection) as ctx:
+        response = unlogged_client.get('/')
+    assert response.status_code == HTTPStatus.OK
+    assert len(ctx.captured_queries) == 0, (
+        'Убедитесь, что главная страница для анонимных пользователей '
+        'отдаётся из кеша.'
+    )
+
+    new_post = mixer.blend(
+        'blog.Post', category=post.category, author=post.author,
+        pub_date=timezone.now() - timedelta(minutes=1))
+    for url in ('/', f'/category/{post.category.slug}/',
+                f'/profile/{post.author.username}/'):
+        assert new_post.title in unlogged_client.get(url).content.decode(), (
+            'Убедитесь, что новая публикация сбрасывает кеш страниц, '
+            'на которых она выводится.'
+        )
+
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.get('/')
+    assert len(ctx.captured_queries) > 0, (
+        'Убедитесь, что страницы не кешируются '
+        'для авторизованных пользователей.'
+    )
+
+
+def test_page_cache_ignores_unknown_query_params(
+        monkeypatch, mixer, unlogged_client, published_category):
+    mixer.cycle(15).blend(
+        'blog.Post', category=published_category,
+        pub_date=timezone.now() - timedelta(days=1))
+    cached_keys = []
+    monkeypatch.setattr(
+        'blog.views.set_page',
+        lambda key, response, timeout: cached_keys.append(key)
+    )
+    for _ in range(2):
+        with CaptureQueriesContext(connection) as ctx:
+            response = unlogged_client.get('/?utm_source=1&page=2')
+        assert response.status_code == HTTPStatus.OK
+        assert len(ctx.captured_queries) > 0
+    unlogged_client.get('/?page=2&page=2')
+    assert not cached_keys, (
+        'Убедитесь, что страницы с посторонними параметрами запроса '
+        'не кешируются.'
+    )
+
+    unlogged_client.get('/?page=2')
+    assert len(cached_keys) == 1, (
+        'Убедитесь, что страницы ленты с номером страницы кешируются.'
+    )
+
+
+def test_page_expires_at_scheduled_publication(mixer, user):
+    mixer.blend(
+        'blog.Post', author=user, is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=30))
+    _, timeout = get_version(('index',), Post.objects.all())
+    assert 0 < timeout <= 30, (
+        'Убедитесь, что страница кешируется не дольше, '
+        'чем до ближайшей отложенной публикации.'
+    )
+
+
+def test_conditional_get(
+        mixer, user_client, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    for client in (user_client, unlogged_client):
+        for url in ('/', f'/posts/{post.id}/'):
+            response = client.get(url)
+            etag = response['ETag']
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                'Убедитесь, что при неизменном ETag '
+                'возвращается ответ 304 Not Modified.'
+            )
+
+    etag = user_client.get(f'/posts/{post.id}/')['ETag']
+    comment = mixer.blend('blog.Comment', post=post)
+    response = user_client.get(
+        f'/posts/{post.id}/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что новый комментарий меняет ETag страницы публикации.'
+    )
+
+    etag = response['ETag']
+    comment.text = 'Исправленный текст'
+    comment.save()
+    response = user_client.get(
+        f'/posts/{post.id}/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что изменение комментария '
+        'меняет ETag страницы публикации.'
+    )
+
+    anonymous_etag = unlogged_client.get(f'/posts/{post.id}/')['ETag']
+    assert anonymous_etag != response['ETag'], (
+        'Убедитесь, что ETag зависит от пользователя.'
+    )
+
+
+def test_etag_changes_after_relogin(
+        client, user, post_with_published_location):
+    user.set_password('password')
+    user.save()
+    credentials = {'username': user.username, 'password': 'password'}
+    url = f'/posts/{post_with_published_location.id}/'
+    client.post('/auth/login/', credentials)
+    etag = client.get(url)['ETag']
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    client.post('/auth/logout/')
+    client.post('/auth/login/', credentials)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что ETag зависит от CSRF-токена: после повторного '
+        'входа страница с формой комментария должна прийти заново.'
+    )
+
+
+def test_post_save_reads_previous_state_once(
+        mixer, unlogged_client, post_with_published_location):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    post.title = 'Новый заголовок'
+    with CaptureQueriesContext(connection) as ctx:
+        post.save()
+    selects = [
+        query for query in ctx.captured_queries
+        if query['sql'].startswith('SELECT')
+    ]
+    assert len(selects) == 1, (
+        'Убедитесь, что при сохранении публикации без смены категории '
+        'и автора прежнее состояние читается одним запросом.'
+    )
+
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1)
+    )
+    new_category = mixer.blend('blog.Category', is_published=True)
+    old_url = f'/category/{post.category.slug}/'
+    new_url = f'/category/{new_category.slug}/'
+    unlogged_client.get(old_url)
+    unlogged_client.get(new_url)
+    post = Post.objects.get(pk=post.pk)
+    post.category = new_category
+    post.save()
+    assert post.title in unlogged_client.get(new_url).content.decode(), (
+        'Убедитесь, что при переносе публикации в другую категорию '
+        'сбрасывается кеш страницы новой категории.'
+    )
+    assert post.title not in unlogged_client.get(old_url).content.decode(), (
+        'Убедитесь, что при переносе публикации в другую категорию '
+        'сбрасывается кеш страницы прежней категории.'
+    )
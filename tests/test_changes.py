@@ -0,0 +1,197 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.changes import after, get_changes
+from blog.models import Post
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+URL = '/api/v1/changes/'
+
+
+def get_all_changes(client, cursor=None):
+    changes = {'posts': [], 'comments': [], 'deleted': []}
+    while True:
+        data = client.get(URL, {'cursor': cursor} if cursor else {}).json()
+        for key in changes:
+            changes[key].extend(data[key])
+        cursor = data['cursor']
+        if not data['has_more']:
+            return changes, cursor
+
+
+def test_changes_since_cursor(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post)
+    changes, cursor = get_all_changes(client)
+    assert [item['id'] for item in changes['posts']] == [post.id]
+    assert [item['id'] for item in changes['comments']] == [comment.id]
+
+    changes, cursor = get_all_changes(client, cursor)
+    assert changes == {'posts': [], 'comments': [], 'deleted': []}, (
+        'Убедитесь, что лента изменений после курсора '
+        'не повторяет уже выданные изменения.'
+    )
+
+    comment.text = 'Новый текст'
+    comment.save()
+    changes, cursor = get_all_changes(client, cursor)
+    assert [item['text'] for item in changes['comments']] == ['Новый текст']
+    assert not changes['posts']
+
+    comment_id = comment.id
+    comment.delete()
+    post.is_published = False
+    post.save()
+    changes, cursor = get_all_changes(client, cursor)
+    assert {'kind': 'comment', 'id': comment_id} in changes['deleted']
+    assert {'kind': 'post', 'id': post.id} in changes['deleted'], (
+        'Убедитесь, что скрытый пост попадает в удалённые.'
+    )
+    assert not changes['posts']
+
+
+def test_scheduled_post_appears_when_published(
+        client, mixer, user, published_category, monkeypatch):
+    pub_date = timezone.now() + timedelta(days=1)
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=pub_date)
+    changes, cursor = get_all_changes(client)
+    assert not changes['posts']
+    monkeypatch.setattr(
+        timezone, 'now', lambda: pub_date + timedelta(seconds=1))
+    changes, _ = get_all_changes(client, cursor)
+    assert [item['id'] for item in changes['posts']] == [post.id], (
+        'Убедитесь, что отложенный пост попадает в ленту изменений, '
+        'когда наступает дата публикации.'
+    )
+
+
+def test_comments_return_when_post_is_republished(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(days=1))
+    post.refresh_from_db()
+    comment = mixer.blend('blog.Comment', post=post)
+    _, cursor = get_all_changes(client)
+
+    post.is_published = False
+    post.save()
+    changes, cursor = get_all_changes(client, cursor)
+    assert {'kind': 'comment', 'id': comment.id} in changes['deleted']
+
+    post.is_published = True
+    post.save()
+    changes, cursor = get_all_changes(client, cursor)
+    assert [item['id'] for item in changes['posts']] == [post.id]
+    assert [item['id'] for item in changes['comments']] == [comment.id], (
+        'Убедитесь, что комментарии снова попадают в ленту изменений, '
+        'когда скрытый пост публикуют повторно.'
+    )
+
+
+def test_comment_count_change_resends_post(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(days=1))
+    _, cursor = get_all_changes(client)
+    mixer.blend('blog.Comment', post=post)
+    changes, _ = get_all_changes(client, cursor)
+    assert [item['comment_count'] for item in changes['posts']] == [1], (
+        'Убедитесь, что пост с изменённым счётчиком комментариев '
+        'снова попадает в ленту изменений.'
+    )
+
+
+def test_changed_posts_seek_index():
+    plan = Post.objects.filter(
+        after('changed_at', [timezone.now(), 0]),
+        changed_at__lte=timezone.now()
+    ).order_by('changed_at', 'pk').explain()
+    assert 'post_changed_at_idx (changed_at>? AND changed_at<?)' in plan, (
+        'Убедитесь, что лента изменений читает индекс по changed_at '
+        f'с позиции курсора:\n{plan}'
+    )
+
+
+def test_changes_are_paged(user, published_category):
+    Post.objects.bulk_create(
+        Post(title=f'Пост {i}', text='Текст', author=user,
+             category=published_category,
+             pub_date=timezone.now() - timedelta(days=1))
+        for i in range(7)
+    )
+    seen, cursor = [], None
+    while True:
+        with CaptureQueriesContext(connection) as ctx:
+            data = get_changes(cursor, limit=3)
+        assert len(ctx.captured_queries) <= 4
+        seen.extend(item['id'] for item in data['posts'])
+        cursor = data['cursor']
+        if not data['has_more']:
+            break
+    assert sorted(seen) == sorted(Post.objects.values_list('pk', flat=True))
+    assert len(seen) == len(set(seen))
+
+
+def test_invalid_cursor(client):
+    assert client.get(URL, {'cursor': 'broken'}).status_code == 400
+
+
+def test_related_changes_reach_feed(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(days=1))
+    comment = mixer.blend('blog.Comment', post=post)
+    _, cursor = get_all_changes(client)
+
+    category = post.category
+    category.is_published = False
+    category.save()
+    changes, cursor = get_all_changes(client, cursor)
+    assert {'kind': 'post', 'id': post.id} in changes['deleted'], (
+        'Убедитесь, что посты снятой с публикации категории '
+        'попадают в удалённые.'
+    )
+    assert {'kind': 'comment', 'id': comment.id} in changes['deleted']
+
+    category.is_published = True
+    category.save()
+    changes, cursor = get_all_changes(client, cursor)
+    assert [item['id'] for item in changes['posts']] == [post.id]
+    assert [item['id'] for item in changes['comments']] == [comment.id]
+
+    location = post.location
+    location.name = 'Новое место'
+    location.save()
+    changes, cursor = get_all_changes(client, cursor)
+    assert [item['location'] for item in changes['posts']] == [
+        'Новое место'
+    ], 'Убедитесь, что переименование местоположения попадает в ленту.'
+
+    author = comment.author
+    author.username = 'renamed'
+    author.save()
+    changes, cursor = get_all_changes(client, cursor)
+    assert [item['author'] for item in changes['comments']] == ['renamed'], (
+        'Убедитесь, что смена username автора попадает в ленту.'
+    )
+
+    category.title = 'Новое название'
+    category.save()
+    changes, _ = get_all_changes(client, cursor)
+    assert [item['category']['title'] for item in changes['posts']] == [
+        'Новое название'
+    ]
+    assert not changes['comments']
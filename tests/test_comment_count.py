@@ -0,0 +1,103 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, DeletedObject, Post
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_comment_count_follows_comment_writes(
+        user_client, user, post_with_published_location):
+    post = post_with_published_location
+    assert post.comment_count == 0
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Текст'})
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что при создании комментария '
+        'увеличивается счётчик комментариев публикации.'
+    )
+
+    comment = Comment.objects.get(post=post)
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        'Убедитесь, что при удалении комментария '
+        'уменьшается счётчик комментариев публикации.'
+    )
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    Post.objects.update(comment_count=0)
+    call_command('recount_comments', stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+
+@pytest.mark.parametrize('n_comments', (2, 50))
+def test_post_delete_does_not_touch_each_comment(
+        mixer, post_with_published_location, n_comments):
+    post = post_with_published_location
+    comment_ids = {
+        comment.id for comment in
+        mixer.cycle(n_comments).blend('blog.Comment', post=post)
+    }
+    with CaptureQueriesContext(connection) as ctx:
+        post.delete()
+    assert len(ctx.captured_queries) <= 8, (
+        'Убедитесь, что при удалении публикации количество запросов '
+        'не зависит от числа её комментариев.'
+    )
+    deleted_comments = set(DeletedObject.objects.filter(
+        kind=DeletedObject.COMMENT
+    ).values_list('object_id', flat=True))
+    assert deleted_comments == comment_ids, (
+        'Убедитесь, что комментарии удалённой публикации '
+        'попадают в список удалённых объектов.'
+    )
+
+
+def test_comment_delete_with_drifted_count(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post)
+    Post.objects.update(comment_count=0)
+    comment.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        'Убедитесь, что счётчик комментариев не становится отрицательным.'
+    )
+
+
+def test_comment_delete_after_failed_post_delete(
+        monkeypatch, mixer, post_with_published_location):
+    post = post_with_published_location
+    first, second = mixer.cycle(2).blend('blog.Comment', post=post)
+
+    def fail(*args, **kwargs):
+        raise OSError('Хранилище недоступно')
+
+    monkeypatch.setattr('blog.images.delete_renditions', fail)
+    with pytest.raises(OSError), transaction.atomic():
+        post.delete()
+    monkeypatch.undo()
+
+    Comment.objects.get(pk=first.pk).delete()
+    post = Post.objects.get(pk=post.pk)
+    assert post.comment_count == 1, (
+        'Убедитесь, что после отменённого удаления публикации '
+        'удаление комментария уменьшает счётчик.'
+    )
+    assert DeletedObject.objects.filter(
+        kind=DeletedObject.COMMENT, object_id=first.pk
+    ).exists()
+    assert not DeletedObject.objects.filter(
+        kind=DeletedObject.COMMENT, object_id=second.pk
+    ).exists()
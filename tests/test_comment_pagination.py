@@ -0,0 +1,51 @@
+from http import HTTPStatus
+
+import pytest
+from bs4 import BeautifulSoup
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+N_COMMENTS = 25
+COMMENTS_PER_PAGE = 20
+
+
+def get_comment_ids(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    return [
+        int(a['name'][len('comment_'):])
+        for a in soup.select('a[name^="comment_"]')
+    ]
+
+
+def test_comments_are_paginated(
+        mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(N_COMMENTS).blend('blog.Comment', post=post)
+    expected = [comment.id for comment in comments]
+
+    response = unlogged_client.get(f'/posts/{post.id}/')
+    page = response.context['comments']
+    assert get_comment_ids(response.content) == expected[:COMMENTS_PER_PAGE], (
+        'Убедитесь, что на странице публикации выводится '
+        'первая страница комментариев.'
+    )
+    assert page.has_next()
+
+    fragment = unlogged_client.get(
+        f'/posts/{post.id}/comments/?cursor={page.next_cursor}')
+    assert fragment.status_code == HTTPStatus.OK
+    assert '<html' not in fragment.content.decode()
+    assert get_comment_ids(fragment.content) == expected[COMMENTS_PER_PAGE:]
+    assert fragment.context['comments'].has_previous()
+    assert not fragment.context['comments'].has_next()
+
+
+def test_comments_fragment_hides_unpublished_post(
+        mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = unlogged_client.get(f'/posts/{post.id}/comments/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,80 @@
+import gzip
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import F
+
+from blog.management.commands.fastload import iter_json_array
+from blog.models import Comment, Post
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+CREATED_AT = '2020-05-01T10:00:00Z'
+
+
+def make_fixture(n_posts):
+    objects = [
+        {'model': 'auth.user', 'pk': 500, 'fields': {
+            'password': '!', 'username': 'loader', 'first_name': '',
+            'last_name': '', 'email': '', 'is_staff': False,
+            'is_active': True, 'is_superuser': False,
+            'date_joined': CREATED_AT, 'groups': [],
+            'user_permissions': []}},
+        {'model': 'blog.category', 'pk': 500, 'fields': {
+            'created_at': CREATED_AT, 'is_published': True,
+            'title': 'Категория', 'slug': 'loaded', 'description': '-'}},
+    ]
+    for i in range(n_posts):
+        objects.append({'model': 'blog.post', 'pk': 1000 + i, 'fields': {
+            'created_at': CREATED_AT, 'is_published': True,
+            'title': f'Пост {i}', 'text': 'Текст', 'pub_date': CREATED_AT,
+            'author': 500, 'category': 500, 'location': None}})
+    objects.append({'model': 'blog.comment', 'pk': 700, 'fields': {
+        'text': 'Комментарий', 'post': 1000, 'author': 500,
+        'created_at': CREATED_AT}})
+    return objects
+
+
+def test_iter_json_array_across_chunks():
+    items = [{'text': 'ё' * i, 'n': [i, {'x': '],'}]} for i in range(50)]
+    stream = io.StringIO(json.dumps(items, ensure_ascii=False, indent=2))
+    assert list(iter_json_array(stream, read_size=7)) == items
+
+
+def test_fastload_preserves_dates_and_counts(tmp_path):
+    path = tmp_path / 'seed.json.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as file:
+        json.dump(make_fixture(25), file, ensure_ascii=False)
+    call_command('fastload', str(path), batch_size=10, stdout=io.StringIO())
+
+    assert Post.objects.filter(pk__gte=1000).count() == 25
+    post = Post.objects.get(pk=1000)
+    expected = datetime(2020, 5, 1, 10, tzinfo=timezone.utc)
+    assert post.created_at == expected, (
+        'Убедитесь, что fastload сохраняет created_at из фикстуры.'
+    )
+    assert post.updated_at is not None
+    assert Comment.objects.get(pk=700).created_at == expected
+    assert post.comment_count == 1, (
+        'Убедитесь, что после загрузки пересчитывается '
+        'количество комментариев.'
+    )
+
+    call_command('fastload', str(path), stdout=io.StringIO())
+    assert Post.objects.filter(pk__gte=1000).count() == 25
+
+
+def test_loaddata_project_fixture():
+    call_command(
+        'loaddata', str(settings.BASE_DIR / 'db.json'), stdout=io.StringIO()
+    )
+    assert Post.objects.exists()
+    assert not Post.objects.filter(changed_at__lt=F('pub_date')).exists(), (
+        'Убедитесь, что changed_at в db.json не раньше даты публикации.'
+    )
@@ -0,0 +1,57 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post, User
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+OPTIONS = {'users': 5, 'posts': 60, 'comments': 200, 'seed': 7}
+
+
+def generate(**options):
+    call_command('generate_blog_data', stdout=StringIO(), **options)
+
+
+def snapshot():
+    return (
+        list(Post.objects.order_by('pk').values_list(
+            'title', 'author__username', 'category__slug', 'is_published',
+            'comment_count')),
+        list(Comment.objects.order_by('pk').values_list(
+            'text', 'post__title')),
+    )
+
+
+def test_generated_data_is_consistent():
+    generate(**OPTIONS)
+    assert User.objects.count() == OPTIONS['users']
+    assert Post.objects.count() == OPTIONS['posts']
+    assert Comment.objects.count() == OPTIONS['comments']
+    counted = Post.objects.annotate(n=Count('comments')).values_list(
+        'comment_count', 'n')
+    assert all(stored == actual for stored, actual in counted), (
+        'Убедитесь, что comment_count совпадает с числом комментариев.'
+    )
+    now = timezone.now()
+    for comment in Comment.objects.select_related('post'):
+        if comment.post.pub_date <= now:
+            assert comment.created_at >= comment.post.pub_date
+
+
+def test_generated_data_is_deterministic():
+    generate(**OPTIONS)
+    first = snapshot()
+    for model in (Comment, Post, Category, Location, User):
+        model.objects.all().delete()
+    generate(**OPTIONS)
+    assert snapshot() == first, (
+        'Убедитесь, что при одинаковом seed создаются одинаковые данные.'
+    )
+    generate(**{**OPTIONS, 'seed': 8})
+    assert Post.objects.count() == OPTIONS['posts'] * 2
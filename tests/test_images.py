@@ -0,0 +1,76 @@
+from io import BytesIO, StringIO
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import RENDITION_WIDTHS
+from blog.models import Post
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture(autouse=True)
+def eager_tasks(settings):
+    settings.TASKS_ALWAYS_EAGER = True
+
+
+def make_image(width, height, image_format='JPEG'):
+    buffer = BytesIO()
+    image = Image.new('RGB', (width, height), 'lightskyblue')
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera'
+    image.save(buffer, image_format, exif=exif)
+    return SimpleUploadedFile(
+        'photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+def test_renditions_are_generated_on_upload(
+        mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    post.image = make_image(800, 400)
+    post.save()
+    post.refresh_from_db()
+
+    storage = post.image.storage
+    widths = [width for width, _ in post.image_renditions['webp']]
+    assert widths == [320, 640, 800], (
+        'Убедитесь, что копии создаются только для ширин '
+        'не больше ширины оригинала.'
+    )
+    for extension in ('webp', 'jpeg'):
+        for width, name in post.image_renditions[extension]:
+            with storage.open(name) as file, Image.open(file) as image:
+                assert image.width == width
+                assert image.format == extension.upper()
+                assert not image.getexif(), (
+                    'Убедитесь, что из копий изображений '
+                    'удаляются метаданные.'
+                )
+
+    soup = BeautifulSoup(unlogged_client.get('/').content, 'html.parser')
+    img = soup.find('picture').find('img')
+    assert 'srcset' in img.attrs and 'sizes' in img.attrs
+    assert soup.find('source', type='image/webp')['srcset'].count('w,') == 2
+
+    post.image = None
+    post.save()
+    for width, name in post.image_renditions['jpeg']:
+        assert not storage.exists(name)
+    post.refresh_from_db()
+    assert post.image_renditions == {}
+
+
+def test_generate_renditions_command(post_with_published_location):
+    post = post_with_published_location
+    post.image = make_image(RENDITION_WIDTHS[-1] * 2, 100)
+    post.save()
+    Post.objects.filter(pk=post.pk).update(image_renditions={})
+    call_command('generate_renditions', stdout=StringIO())
+    post.refresh_from_db()
+    assert [width for width, _ in post.image_renditions['jpeg']] == list(
+        RENDITION_WIDTHS)
@@ -0,0 +1,65 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='План запроса проверяется только для SQLite.'
+    ),
+]
+
+
+def get_view_query_plan(view_class, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view.get_queryset()[:10].explain()
+
+
+def test_feed_queries_use_indexes(mixer, user, published_category):
+    from blog.views import (
+        PostCategoryListView, PostListView, ProfileListView)
+
+    mixer.cycle(5).blend(
+        'blog.Post', category=published_category, author=user)
+    for view_class, kwargs, index_name in (
+            (PostListView, {}, 'post_published_pub_date_idx'),
+            (PostCategoryListView,
+             {'category_slug': published_category.slug},
+             'post_category_pub_date_idx'),
+            (ProfileListView, {'username': user.username},
+             'post_author_pub_date_idx'),
+    ):
+        plan = get_view_query_plan(view_class, **kwargs)
+        assert f'blog_post USING INDEX {index_name}' in plan, (
+            f'Убедитесь, что запрос `{view_class.__name__}` '
+            f'использует индекс `{index_name}`:\n{plan}'
+        )
+
+
+@pytest.mark.parametrize('backwards', (False, True))
+def test_comment_cursor_page_uses_index(
+        mixer, post_with_published_location, backwards):
+    from blog.paginators import CursorPaginator
+    from blog.views import COMMENT_LIMIT, COMMENT_ORDERING
+
+    post = post_with_published_location
+    mixer.cycle(5).blend('blog.Comment', post=post)
+    comments = post.comments.select_related('author')
+    paginator = CursorPaginator(comments, COMMENT_LIMIT, COMMENT_ORDERING)
+    ordering = paginator._ordering(backwards)
+    plan = comments.order_by(*ordering).filter(
+        paginator._after(ordering, [post.pub_date, 1])
+    )[:COMMENT_LIMIT + 1].explain()
+    assert 'blog_comment USING INDEX comment_post_created_at_idx' in plan, (
+        'Убедитесь, что страница комментариев публикации использует '
+        f'индекс `comment_post_created_at_idx`:\n{plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        'Убедитесь, что комментарии публикации не сортируются '
+        f'во временном индексе:\n{plan}'
+    )
@@ -0,0 +1,99 @@
+import json
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from blog.loadtest import build_scenarios, compare, send, summarize
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def test_summarize_percentiles():
+    summary = summarize(
+        [n / 1000 for n in range(1, 101)], Counter({500: 2}), 0.5
+    )
+    assert summary['p50'] == pytest.approx(50.5)
+    assert summary['p99'] == pytest.approx(99.01)
+    assert summary['requests'] == 100
+    assert summary['errors'] == 2
+    assert summary['error_statuses'] == {'500': 2}
+    assert summary['rps'] == 200
+
+
+def test_loadtest_client_driver_saves_baseline(tmp_path):
+    call_command(
+        'generate_blog_data', users=3, posts=20, comments=40,
+        stdout=StringIO()
+    )
+    output = tmp_path / 'baseline.json'
+    call_command(
+        'loadtest', in_place=True, requests=3, output=str(output),
+        stdout=StringIO()
+    )
+    report = json.loads(output.read_text(encoding='utf-8'))
+    scenarios = report['scenarios']
+    for name in ('index', 'category', 'profile', 'index_uncached',
+                 'category_uncached', 'profile_uncached', 'search',
+                 'detail', 'comment_create'):
+        assert name in scenarios, (
+            f'Убедитесь, что нагрузочный тест проверяет сценарий {name}.'
+        )
+        assert scenarios[name]['errors'] == 0
+        assert scenarios[name]['p50'] <= scenarios[name]['p99']
+    assert report['meta']['driver'] == 'client'
+
+
+def test_uncached_scenarios_miss_page_cache():
+    call_command(
+        'generate_blog_data', users=3, posts=20, comments=40,
+        stdout=StringIO()
+    )
+    scenarios = {
+        scenario.name: scenario for scenario in build_scenarios()
+    }
+    client = Client()
+    for name in ('index', 'category', 'profile'):
+        for scenario, cached in ((scenarios[name], True),
+                                 (scenarios[f'{name}_uncached'], False)):
+            send(client, scenario)
+            with CaptureQueriesContext(connection) as ctx:
+                send(client, scenario)
+            assert bool(ctx.captured_queries) is not cached, (
+                f'Убедитесь, что сценарий {scenario.name} '
+                + ('отдаётся из кеша.' if cached
+                   else 'не попадает в кеш страниц.')
+            )
+
+
+def test_loadtest_fails_on_regression(tmp_path):
+    call_command(
+        'generate_blog_data', users=3, posts=20, comments=40,
+        stdout=StringIO()
+    )
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps({
+        'meta': {'driver': 'client'},
+        'scenarios': {'index': {'p95': 0.0001}},
+    }))
+    with pytest.raises(CommandError, match='index'):
+        call_command(
+            'loadtest', in_place=True, requests=3, scenario=['index'],
+            compare=str(baseline), stdout=StringIO()
+        )
+
+
+def test_compare_reports_change():
+    report = {'scenarios': {'index': {'p95': 12.0}, 'new': {'p95': 1.0}}}
+    baseline = {'scenarios': {'index': {'p95': 10.0}}}
+    rows, regressions = compare(report, baseline, 0.1)
+    assert rows == [('index', 10.0, 12.0, pytest.approx(0.2))]
+    assert regressions == ['index']
+    assert compare(report, baseline, 0.5)[1] == []
@@ -0,0 +1,98 @@
+import subprocess
+import sys
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import Client
+from prometheus_client import REGISTRY
+
+from tasks.queue import enqueue
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+RECORD_CACHE_HIT = (
+    'import django; django.setup(); '
+    'from monitoring.metrics import record_cache; '
+    'record_cache("page", True)'
+)
+
+
+@pytest.fixture
+def staff_client(mixer):
+    client = Client()
+    client.force_login(mixer.blend(get_user_model(), is_staff=True))
+    return client
+
+
+def test_metrics_are_protected(client, user_client, settings):
+    assert client.get('/metrics').status_code == HTTPStatus.FORBIDDEN
+    assert user_client.get('/metrics').status_code == HTTPStatus.FORBIDDEN, (
+        'Убедитесь, что метрики недоступны обычным пользователям.'
+    )
+    settings.MONITORING_METRICS_TOKEN = 'secret'
+    response = client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong')
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    response = client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что метрики доступны по токену.'
+    )
+
+
+def test_request_and_cache_metrics(client, staff_client):
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    requests = sample(
+        'blogicum_request_duration_seconds_count',
+        view='blog:index', method='GET')
+    hits = sample('blogicum_cache_requests_total', cache='page', result='hit')
+    client.get('/')
+    client.get('/')
+    assert sample(
+        'blogicum_request_duration_seconds_count',
+        view='blog:index', method='GET') == requests + 2
+    assert sample(
+        'blogicum_cache_requests_total', cache='page', result='hit'
+    ) == hits + 1, 'Убедитесь, что попадания в кеш страниц учитываются.'
+    response = staff_client.get('/metrics')
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('text/plain')
+    body = response.content.decode()
+    for name in ('blogicum_request_duration_seconds_bucket',
+                 'blogicum_request_queries_bucket',
+                 'blogicum_image_processing_seconds'):
+        assert name in body, f'Убедитесь, что метрика {name} отдаётся.'
+
+
+def test_task_queue_depth(staff_client):
+    enqueue('tasks.mail.send_email', ({},))
+    enqueue('tasks.mail.send_email', ({},))
+    body = staff_client.get('/metrics').content.decode()
+    assert (
+        'blogicum_task_queue_depth{status="pending",'
+        'task="tasks.mail.send_email"} 2.0'
+    ) in body, 'Убедитесь, что метрики показывают очередь писем.'
+
+
+def test_metrics_aggregate_across_processes(
+        staff_client, tmp_path, monkeypatch):
+    env = {
+        'PROMETHEUS_MULTIPROC_DIR': str(tmp_path),
+        'DJANGO_SETTINGS_MODULE': 'blogicum.settings',
+        'PATH': '',
+    }
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, '-c', RECORD_CACHE_HIT],
+            cwd=PROJECT_DIR, env=env, check=True
+        )
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    body = staff_client.get('/metrics').content.decode()
+    assert (
+        'blogicum_cache_requests_total{cache="page",result="hit"} 2.0'
+    ) in body, 'Убедитесь, что метрики разных процессов складываются.'
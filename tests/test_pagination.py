@@ -0,0 +1,295 @@
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.cache import INDEX_SCOPE, count_key
+from blog.models import Post
+from blog.paginators import CursorPaginator
+from conftest import N_PER_PAGE
+from tasks.models import Task
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+def _get_captured(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    return response, ctx.captured_queries
+
+
+def test_category_page_is_limited_in_db(
+        mixer, unlogged_client, published_category):
+    mixer.cycle(N_PER_PAGE * 3).blend(
+        'blog.Post', category=published_category, is_published=True)
+    url = f'/category/{published_category.slug}/?page=2'
+    response, queries = _get_captured(unlogged_client, url)
+    assert len(response.context['page_obj']) == N_PER_PAGE
+    post_queries = [
+        q['sql'] for q in queries
+        if q['sql'].startswith('SELECT "blog_post"')]
+    assert len(post_queries) == 1, (
+        'Убедитесь, что публикации страницы категории '
+        'загружаются одним запросом.'
+    )
+    assert 'LIMIT' in post_queries[0], (
+        'Убедитесь, что пагинация на странице категории '
+        'выполняется на уровне базы данных.'
+    )
+
+
+def test_profile_page_does_not_depend_on_post_count(
+        mixer, user, unlogged_client, published_category):
+    n_posts = 10000
+    pub_date = timezone.now() - timedelta(days=1)
+    Post.objects.bulk_create(
+        Post(title=f'Пост {i}', text='Текст', pub_date=pub_date,
+             author=user, category=published_category)
+        for i in range(n_posts)
+    )
+    url = f'/profile/{user.username}/?page=500'
+    tracemalloc.start()
+    try:
+        response, queries = _get_captured(unlogged_client, url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.context['page_obj']) == N_PER_PAGE
+    assert len(queries) <= 4, (
+        'Убедитесь, что страница пользователя загружается '
+        'не более чем четырьмя запросами к базе данных.'
+    )
+    user_queries = [
+        q['sql'] for q in queries
+        if q['sql'].startswith('SELECT "auth_user"')]
+    assert len(user_queries) == 1, (
+        'Убедитесь, что автор загружается одним запросом по username.'
+    )
+    assert peak < 5 * 1024 * 1024, (
+        'Убедитесь, что публикации пользователя не загружаются '
+        'в память целиком.'
+    )
+    page_links = response.content.decode().count('class="page-link"')
+    assert page_links < 20, (
+        'Убедитесь, что пагинатор выводит не все номера страниц, '
+        'а только ближайшие к текущей и крайние.'
+    )
+
+
+def test_cursor_pagination_walks_feed(
+        settings, mixer, user, unlogged_client, published_category):
+    settings.BLOG_CURSOR_PAGINATION = True
+    pub_date = timezone.now() - timedelta(days=1)
+    posts = Post.objects.bulk_create(
+        Post(title=f'Пост {i}', text='Текст', author=user,
+             category=published_category,
+             pub_date=pub_date - timedelta(hours=i // 3))
+        for i in range(N_PER_PAGE * 2 + 5)
+    )
+    expected = [
+        post.pk for post in sorted(
+            Post.objects.all(), key=lambda p: (p.pub_date, p.pk),
+            reverse=True)
+    ]
+    assert len(expected) == len(posts)
+
+    seen, pages, cursor = [], [], None
+    while True:
+        url = '/' + (f'?cursor={cursor}' if cursor else '')
+        response, queries = _get_captured(unlogged_client, url)
+        assert not any('COUNT(*)' in q['sql'] for q in queries)
+        page = response.context['page_obj']
+        pages.append(page)
+        seen.extend(post.pk for post in page)
+        if not page.has_next():
+            break
+        cursor = page.next_cursor
+    assert seen == expected, (
+        'Убедитесь, что курсорная пагинация выдаёт все публикации '
+        'без пропусков и повторов.'
+    )
+
+    response = unlogged_client.get(f'/?cursor={pages[-1].previous_cursor}')
+    assert [post.pk for post in response.context['page_obj']] == [
+        post.pk for post in pages[-2]]
+
+    assert unlogged_client.get('/?cursor=broken').status_code == (
+        HTTPStatus.NOT_FOUND)
+
+
+@pytest.mark.parametrize('backwards', (False, True))
+def test_cursor_page_seeks_index(backwards):
+    posts = Post.objects.filter(is_published=True)
+    paginator = CursorPaginator(posts, N_PER_PAGE)
+    ordering = paginator._ordering(backwards)
+    plan = posts.order_by(*ordering).filter(
+        paginator._after(ordering, [timezone.now(), 1])
+    )[:N_PER_PAGE + 1].explain()
+    assert 'post_published_pub_date_idx (pub_date' in plan, (
+        'Убедитесь, что курсорная страница начинает обход индекса '
+        'с позиции курсора, а не с начала ленты.'
+    )
+
+
+def _count_queries(queries):
+    return [q['sql'] for q in queries if 'COUNT(*)' in q['sql']]
+
+
+def test_large_feed_count_is_cached(
+        monkeypatch, mixer, user, user_client, published_category):
+    monkeypatch.setattr('blog.cache.COUNT_THRESHOLD', N_PER_PAGE)
+    pub_date = timezone.now() - timedelta(days=1)
+    Post.objects.bulk_create(
+        Post(title=f'Пост {i}', text='Текст', pub_date=pub_date,
+             author=user, category=published_category)
+        for i in range(N_PER_PAGE + 5)
+    )
+    _, queries = _get_captured(user_client, '/')
+    assert len(_count_queries(queries)) == 1
+    response, queries = _get_captured(user_client, '/?page=2')
+    assert not _count_queries(queries), (
+        'Убедитесь, что количество публикаций большой ленты '
+        'берётся из кеша.'
+    )
+    assert response.context['paginator'].count == N_PER_PAGE + 5
+
+    mixer.blend('blog.Post', author=user, category=published_category,
+                pub_date=pub_date)
+    response, queries = _get_captured(user_client, '/')
+    assert len(_count_queries(queries)) == 1, (
+        'Убедитесь, что количество публикаций пересчитывается '
+        'после появления новой публикации.'
+    )
+    assert response.context['paginator'].count == N_PER_PAGE + 6
+
+
+def test_stale_feed_count_is_refreshed_in_background(
+        monkeypatch, user, user_client, published_category):
+    monkeypatch.setattr('blog.cache.COUNT_THRESHOLD', N_PER_PAGE)
+    pub_date = timezone.now() - timedelta(days=1)
+    Post.objects.bulk_create(
+        Post(title=f'Пост {i}', text='Текст', pub_date=pub_date,
+             author=user, category=published_category)
+        for i in range(N_PER_PAGE + 5)
+    )
+    cache.set(
+        count_key(INDEX_SCOPE), (N_PER_PAGE * 5, 0, time.time() + 60), None
+    )
+    response, queries = _get_captured(user_client, '/')
+    assert not _count_queries(queries)
+    assert response.context['paginator'].count == N_PER_PAGE * 5
+    assert Task.objects.filter(
+        name='blog.tasks.refresh_post_count').count() == 1, (
+        'Убедитесь, что устаревшее количество публикаций '
+        'пересчитывается фоновой задачей.'
+    )
+    user_client.get('/')
+    assert Task.objects.count() == 1
+
+    call_command('runworker', once=True, stdout=StringIO())
+    response = user_client.get('/')
+    assert response.context['paginator'].count == N_PER_PAGE + 5
+
+
+def test_stale_feed_count_expires_without_worker(
+        monkeypatch, user, user_client, published_category):
+    monkeypatch.setattr('blog.cache.COUNT_THRESHOLD', N_PER_PAGE)
+    pub_date = timezone.now() - timedelta(days=1)
+    Post.objects.bulk_create(
+        Post(title=f'Пост {i}', text='Текст', pub_date=pub_date,
+             author=user, category=published_category)
+        for i in range(N_PER_PAGE + 5)
+    )
+    expires_at = time.time() + 60
+    cache.set(count_key(INDEX_SCOPE), (N_PER_PAGE * 5, 0, expires_at), None)
+    user_client.get('/')
+    assert cache.get(count_key(INDEX_SCOPE))[2] == expires_at, (
+        'Убедитесь, что чтение устаревшего количества не продлевает '
+        'срок его хранения.'
+    )
+
+    cache.set(count_key(INDEX_SCOPE), (N_PER_PAGE * 5, 0, time.time()), None)
+    response, queries = _get_captured(user_client, '/')
+    assert len(_count_queries(queries)) == 1, (
+        'Убедитесь, что количество, которое фоновая задача не обновила '
+        'вовремя, пересчитывается при запросе.'
+    )
+    assert response.context['paginator'].count == N_PER_PAGE + 5
+
+
+def test_page_past_cached_count_is_recounted(
+        monkeypatch, user, user_client, published_category):
+    monkeypatch.setattr('blog.cache.COUNT_THRESHOLD', N_PER_PAGE)
+    pub_date = timezone.now() - timedelta(days=1)
+    Post.objects.bulk_create(
+        Post(title=f'Пост {i}', text='Текст', pub_date=pub_date,
+             author=user, category=published_category)
+        for i in range(N_PER_PAGE + 5)
+    )
+    cache.set(
+        count_key(INDEX_SCOPE),
+        (N_PER_PAGE, time.time() + 60, time.time() + 60), None
+    )
+    response = user_client.get('/?page=2')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что страница за концом ленты по закешированному '
+        'количеству пересчитывает его, а не возвращает 404.'
+    )
+    assert len(response.context['page_obj']) == 5
+    assert user_client.get('/?page=3').status_code == HTTPStatus.NOT_FOUND
+
+
+def test_category_unpublishing_resets_counts(
+        monkeypatch, user, user_client, published_category):
+    monkeypatch.setattr('blog.cache.COUNT_THRESHOLD', N_PER_PAGE)
+    pub_date = timezone.now() - timedelta(days=1)
+    Post.objects.bulk_create(
+        Post(title=f'Пост {i}', text='Текст', pub_date=pub_date,
+             author=user, category=published_category)
+        for i in range(N_PER_PAGE + 5)
+    )
+    user_client.get('/')
+    published_category.is_published = False
+    published_category.save()
+    response = user_client.get('/')
+    assert response.context['paginator'].count == 0, (
+        'Убедитесь, что снятие категории с публикации сбрасывает '
+        'закешированное количество публикаций.'
+    )
+
+
+def test_cache_is_shared_between_processes():
+    subprocess.run([
+        sys.executable, str(settings.BASE_DIR / 'manage.py'), 'shell',
+        '-c', 'from django.core.cache import cache; '
+              'cache.set("blog:test:shared", 1)',
+    ], check=True)
+    assert cache.get('blog:test:shared') == 1, (
+        'Убедитесь, что кеш общий для процессов сайта и обработчика '
+        'задач: иначе фоновый пересчёт количества публикаций '
+        'не виден сайту.'
+    )
+
+
+def test_small_feed_is_counted_exactly(
+        user, user_client, published_category):
+    Post.objects.create(title='Пост', text='Текст', author=user,
+                        category=published_category,
+                        pub_date=timezone.now() - timedelta(days=1))
+    for _ in range(2):
+        _, queries = _get_captured(user_client, '/')
+        assert len(_count_queries(queries)) == 1
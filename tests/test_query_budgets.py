@@ -0,0 +1,100 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+from blog.models import Post
+from conftest import QueryBudget, max_queries
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+ANONYMOUS_BUDGETS = {
+    'blog:index': 3,
+    'blog:category_posts': 4,
+    'blog:profile': 4,
+    'blog:post_detail': 3,
+    'blog:comments': 2,
+    'blog:search': 3,
+    'api:post-list': 1,
+    'api:post-detail': 1,
+    'api:comment-list': 2,
+    'api:category-list': 1,
+    'api:changes': 4,
+    'pages:about': 0,
+}
+AUTHOR_BUDGETS = {
+    'blog:add_comment': 8,
+    'blog:edit_post': 5,
+    'blog:edit_profile': 2,
+}
+
+
+@pytest.fixture(params=(5, 60), ids=('few-posts', 'many-posts'))
+def blog_data(request):
+    n_posts = request.param
+    call_command(
+        'generate_blog_data', users=4, posts=n_posts,
+        comments=n_posts * 5, seed=1, stdout=StringIO()
+    )
+    return Post.objects.filter(
+        is_published=True, category__is_published=True
+    ).select_related('author', 'category').order_by(
+        '-comment_count', 'pk'
+    ).first()
+
+
+def anonymous_urls(post):
+    word = post.title.split()[0]
+    return (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+        f'/posts/{post.pk}/',
+        f'/posts/{post.pk}/comments/',
+        f'/search/?q={word}',
+        '/api/v1/posts/',
+        f'/api/v1/posts/{post.pk}/',
+        f'/api/v1/posts/{post.pk}/comments/',
+        '/api/v1/categories/',
+        '/api/v1/changes/',
+        '/pages/about/',
+    )
+
+
+def test_anonymous_pages_fit_query_budget(client, blog_data):
+    with QueryBudget(ANONYMOUS_BUDGETS) as budget:
+        for url in anonymous_urls(blog_data):
+            assert client.get(url).status_code == HTTPStatus.OK, url
+    checked = {url_name for url_name, _ in budget.counts}
+    assert checked == set(ANONYMOUS_BUDGETS), (
+        'Убедитесь, что для каждого URL из бюджета есть запрос в тесте.'
+    )
+
+
+def test_author_pages_fit_query_budget(blog_data, query_budget):
+    for url_name, limit in AUTHOR_BUDGETS.items():
+        query_budget.set(url_name, limit)
+    client = Client()
+    client.force_login(blog_data.author)
+    response = client.post(
+        f'/posts/{blog_data.pk}/comment/', {'text': 'Комментарий'}
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    for url in (f'/posts/{blog_data.pk}/edit/', '/profile/edit/'):
+        assert client.get(url).status_code == HTTPStatus.OK, url
+
+
+@max_queries('blog:index', ANONYMOUS_BUDGETS['blog:index'])
+def test_index_budget_does_not_depend_on_posts(client, blog_data):
+    for page in (1, 2):
+        client.get(f'/?page={page}')
+
+
+def test_exceeded_budget_fails_test(client, blog_data):
+    with pytest.raises(pytest.fail.Exception, match='blog:index'):
+        with QueryBudget({'blog:index': 1}):
+            client.get('/')
@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog.models import Comment, Post
+from blog.search import COMMENT_INDEX, POST_INDEX, build_match_query
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category):
+    return {
+        'title': mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            title='Прогулка по Байкалу', text='Вода и лёд.'),
+        'text': mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            title='Заметки', text='Зимой мы ездили на Байкал <b>смотреть</b>'),
+        'other': mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            title='Горы', text='Алтай летом.'),
+    }
+
+
+def test_build_match_query_escapes_syntax():
+    assert build_match_query('NEAR(a b) OR "c') == (
+        '"NEAR"* "a"* "b"* "OR"* "c"*')
+    assert build_match_query('  *:- ') == ''
+
+
+def test_index_follows_changes(searchable_posts):
+    match = build_match_query('алтай')
+    post = searchable_posts['other']
+    assert list(POST_INDEX.filter(Post.objects.all(), match)) == [post]
+    post.text = 'Кавказ осенью.'
+    post.save()
+    assert not POST_INDEX.filter(Post.objects.all(), match).exists(), (
+        'Убедитесь, что поисковый индекс обновляется вместе с публикацией.'
+    )
+    Post.objects.filter(pk=post.pk).update(title='Алтай')
+    assert POST_INDEX.filter(Post.objects.all(), match).exists()
+    post.delete()
+    assert not POST_INDEX.filter(Post.objects.all(), match).exists()
+
+
+def test_search_page_ranks_and_highlights(client, searchable_posts):
+    response = client.get('/search/', {'q': 'байкал'})
+    assert response.status_code == HTTPStatus.OK
+    found = list(response.context['page_obj'])
+    assert found == [searchable_posts['title'], searchable_posts['text']], (
+        'Убедитесь, что совпадения в заголовке ранжируются выше '
+        'совпадений в тексте.'
+    )
+    snippet = found[1].snippet
+    assert '<mark>Байкал</mark>' in snippet
+    assert '&lt;b&gt;' in snippet, (
+        'Убедитесь, что текст во фрагментах результатов экранируется.'
+    )
+
+
+def test_search_respects_publication(client, searchable_posts):
+    post = searchable_posts['title']
+    post.is_published = False
+    post.save()
+    response = client.get('/search/', {'q': 'байкал'})
+    assert post not in response.context['page_obj'], (
+        'Убедитесь, что поиск не находит снятые с публикации посты.'
+    )
+
+
+def test_search_keeps_query_in_pagination(
+        client, mixer, user, published_category):
+    mixer.cycle(12).blend(
+        'blog.Post', author=user, category=published_category,
+        title='Байкал')
+    content = client.get('/search/', {'q': 'байкал'}).content.decode()
+    assert '?q=%D0%B1%D0%B0%D0%B9%D0%BA%D0%B0%D0%BB&amp;page=2' in content
+
+
+def test_admin_search_uses_index(admin_client, mixer, searchable_posts):
+    response = admin_client.get('/admin/blog/post/', {'q': 'байкал'})
+    assert set(response.context['cl'].result_list) == {
+        searchable_posts['title'], searchable_posts['text']}
+    comment = mixer.blend(
+        'blog.Comment', post=searchable_posts['other'], text='Отличный отчёт')
+    assert list(COMMENT_INDEX.filter(
+        Comment.objects.all(), build_match_query('отчёт'))) == [comment]
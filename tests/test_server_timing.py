@@ -0,0 +1,57 @@
+import json
+import logging
+
+import pytest
+from django.test import Client
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def server_timing(settings):
+    settings.MONITORING_SERVER_TIMING = True
+    settings.MONITORING_SAMPLE_RATE = 1.0
+    return settings
+
+
+def parse_header(value):
+    metrics = {}
+    for metric in value.split(', '):
+        name, *params = metric.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+def test_server_timing_is_opt_in(post_with_published_location):
+    response = Client().get(f'/posts/{post_with_published_location.id}/')
+    assert 'Server-Timing' not in response, (
+        'Убедитесь, что заголовок Server-Timing по умолчанию не отдаётся.'
+    )
+
+
+def test_server_timing_header_and_log(
+        server_timing, post_with_published_location, caplog):
+    with caplog.at_level(logging.INFO, logger='monitoring.requests'):
+        response = Client().get(
+            f'/posts/{post_with_published_location.id}/')
+    metrics = parse_header(response['Server-Timing'])
+    assert set(metrics) == {'db', 'tpl', 'app', 'total', 'queries'}
+    assert int(metrics['queries']['desc']) > 0
+    assert float(metrics['tpl']['dur']) > 0, (
+        'Убедитесь, что время отрисовки шаблона попадает в Server-Timing.'
+    )
+    assert float(metrics['db']['dur']) <= float(metrics['total']['dur'])
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['view'] == 'blog:post_detail'
+    assert record['status'] == 200
+    assert record['queries'] == int(metrics['queries']['desc'])
+
+
+def test_server_timing_sampling(server_timing, post_with_published_location):
+    server_timing.MONITORING_SAMPLE_RATE = 0
+    response = Client().get(f'/posts/{post_with_published_location.id}/')
+    assert 'Server-Timing' not in response, (
+        'Убедитесь, что запросы вне выборки не измеряются.'
+    )
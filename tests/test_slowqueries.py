@@ -0,0 +1,105 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+from monitoring.slowqueries import get_log_files, normalize_sql
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+
+@pytest.fixture
+def slow_query_log(settings, tmp_path, monkeypatch):
+    """Записывает все запросы в лог во временном каталоге."""
+    settings.MONITORING_SLOW_QUERY_MS = 0
+    path = tmp_path / 'slowqueries.log'
+    handler = logging.FileHandler(path, encoding='utf-8')
+    monkeypatch.setattr(
+        logging.getLogger('monitoring.slowqueries'), 'handlers', [handler])
+    yield path
+    handler.close()
+
+
+def test_normalize_sql():
+    first = normalize_sql(
+        'SELECT "id" FROM "blog_post" WHERE "id" IN (%s, %s, %s) '
+        "AND \"title\" = 'Мир'  LIMIT 21")
+    second = normalize_sql(
+        'SELECT "id" FROM "blog_post" WHERE "id" IN (%s) '
+        "AND \"title\" = 'Байкал' LIMIT 10")
+    assert first == second == (
+        'SELECT "id" FROM "blog_post" WHERE "id" IN (...) '
+        'AND "title" = ? LIMIT ?'
+    ), 'Убедитесь, что SQL нормализуется без значений параметров.'
+
+
+def test_slow_queries_are_logged_with_plan(
+        slow_query_log, post_with_published_location):
+    post = post_with_published_location
+    Client().get(f'/posts/{post.id}/')
+    records = [
+        json.loads(line)
+        for line in slow_query_log.read_text(encoding='utf-8').splitlines()
+    ]
+    post_queries = [
+        record for record in records
+        if 'FROM "blog_post"' in record['sql']
+        and record['sql'].startswith('SELECT')
+    ]
+    assert post_queries, 'Убедитесь, что медленные запросы пишутся в лог.'
+    record = post_queries[0]
+    assert record['view'] == 'blog:post_detail'
+    assert record['origin'] and record['origin'].startswith('blog/'), (
+        'Убедитесь, что для запроса указано место вызова в коде проекта.'
+    )
+    assert record['plan'], 'Убедитесь, что в лог попадает план запроса.'
+    assert all('EXPLAIN' not in record['sql'] for record in records)
+
+
+def test_query_from_template_reports_template(
+        slow_query_log, post_with_published_location):
+    Client().get('/')
+    origins = {
+        json.loads(line)['origin']
+        for line in slow_query_log.read_text(encoding='utf-8').splitlines()
+    }
+    assert 'template blog/index.html' in origins, (
+        'Убедитесь, что для запросов из шаблона указывается шаблон.'
+    )
+
+
+def test_slowqueries_report(slow_query_log, post_with_published_location):
+    for _ in range(3):
+        Client().get(f'/posts/{post_with_published_location.id}/')
+    stdout = StringIO()
+    call_command(
+        'slowqueries', file=str(slow_query_log), sort='count', plan=True,
+        stdout=stdout
+    )
+    report = stdout.getvalue()
+    assert 'запросов: 3' in report, (
+        'Убедитесь, что отчёт объединяет запросы по отпечатку.'
+    )
+    assert 'blog:post_detail (3)' in report
+
+
+def test_slow_query_log_can_be_disabled(
+        settings, slow_query_log, post_with_published_location):
+    settings.MONITORING_SLOW_QUERY_MS = None
+    Client().get(f'/posts/{post_with_published_location.id}/')
+    assert slow_query_log.read_text(encoding='utf-8') == ''
+
+
+def test_rotated_logs_are_read_oldest_first(tmp_path):
+    path = tmp_path / 'slowqueries.log'
+    for name in ('slowqueries.log', 'slowqueries.log.1',
+                 'slowqueries.log.2', 'slowqueries.log.bak'):
+        (tmp_path / name).write_text('')
+    assert get_log_files(path) == [
+        f'{path}.2', f'{path}.1', str(path)
+    ]
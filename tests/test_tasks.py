@@ -0,0 +1,106 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import OperationalError
+
+from tasks.models import Task
+from tasks import queue
+from tasks.queue import task
+
+pytestmark = [
+    pytest.mark.django_db
+]
+
+CALLS = []
+
+
+@task
+def record_call(value):
+    CALLS.append(value)
+
+
+@task(max_attempts=2)
+def always_fail():
+    raise RuntimeError('Сбой задачи')
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    CALLS.clear()
+
+
+def run_worker():
+    call_command('runworker', once=True, stdout=StringIO())
+
+
+def test_task_is_queued_and_executed_by_worker():
+    record_call.delay(42)
+    assert CALLS == [], 'Убедитесь, что задача не выполняется сразу.'
+    assert Task.objects.filter(status=Task.PENDING).count() == 1
+    run_worker()
+    assert CALLS == [42]
+    assert not Task.objects.exists(), (
+        'Убедитесь, что выполненные задачи удаляются из очереди.'
+    )
+
+
+def test_failed_task_is_retried_then_marked_failed():
+    always_fail.delay()
+    run_worker()
+    queued = Task.objects.get()
+    assert queued.status == Task.PENDING and queued.attempts == 1, (
+        'Убедитесь, что упавшая задача возвращается в очередь.'
+    )
+    assert 'Сбой задачи' in queued.last_error
+
+    Task.objects.update(run_after=queued.created_at)
+    run_worker()
+    queued.refresh_from_db()
+    assert queued.status == Task.FAILED, (
+        'Убедитесь, что после исчерпания попыток задача помечается ошибкой.'
+    )
+
+
+def test_worker_survives_database_errors(monkeypatch):
+    claim = queue.claim
+    failures = []
+
+    def locked_once():
+        if not failures:
+            failures.append(True)
+            raise OperationalError('database is locked')
+        return claim()
+
+    monkeypatch.setattr(queue, 'claim', locked_once)
+    record_call.delay(7)
+    assert queue.work(once=True, sleep=0) == 1, (
+        'Убедитесь, что ошибка базы при взятии задачи '
+        'не останавливает обработчик.'
+    )
+    assert failures and CALLS == [7]
+    assert not Task.objects.exists()
+
+
+def test_eager_mode(settings):
+    settings.TASKS_ALWAYS_EAGER = True
+    record_call.delay('eager')
+    assert CALLS == ['eager']
+    assert not Task.objects.exists()
+
+
+def test_queued_email_backend(settings):
+    settings.EMAIL_BACKEND = 'tasks.mail.QueuedEmailBackend'
+    settings.TASKS_EMAIL_BACKEND = (
+        'django.core.mail.backends.locmem.EmailBackend')
+    message = mail.EmailMultiAlternatives(
+        'Тема', 'Текст', 'from@example.com', ['to@example.com'])
+    message.attach_alternative('<p>Текст</p>', 'text/html')
+    message.send()
+    assert len(mail.outbox) == 0
+    run_worker()
+    assert len(mail.outbox) == 1
+    sent = mail.outbox[0]
+    assert sent.subject == 'Тема' and sent.to == ['to@example.com']
+    assert sent.alternatives == [('<p>Текст</p>', 'text/html')]